@@ -0,0 +1,97 @@
+import asyncio
+import re
+import time
+from typing import Mapping, Optional
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds from an OpenAI x-ratelimit-reset-* header such as "1s", "6m0s" or "20ms"."""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """How long a 429 response asks us to wait, in seconds."""
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    if headers.get("retry-after", "").replace(".", "", 1).isdigit():
+        return float(headers["retry-after"])
+    return parse_reset(headers.get("x-ratelimit-reset-requests"))
+
+
+class AdaptiveConcurrency:
+    """
+    An asyncio concurrency limit that tunes itself from the API's feedback
+    (additive increase, multiplicative decrease, as in TCP congestion control):
+
+    - every success grows the limit by ``increase`` slots per "window" of
+      ``limit`` successes, unless the rate-limit headers show fewer than
+      ``headroom`` of the request budget left;
+    - every 429 cuts the limit by ``decrease`` and stops new requests from
+      starting until the server's Retry-After (or the budget reset) passes.
+
+    Use ``async with limiter:`` around each request and report its outcome
+    with ``on_success`` / ``on_rate_limited``.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 increase: float = 1.0, decrease: float = 0.5, headroom: float = 0.1):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.headroom = headroom
+        self.active = 0
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    # Let the pause lapse, then recheck: another 429 may have extended it
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.active < int(self.limit):
+                    break
+                await self._condition.wait()
+            self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def on_success(self, headers: Optional[Mapping[str, str]] = None):
+        headers = headers or {}
+        remaining, budget = headers.get("x-ratelimit-remaining-requests"), headers.get("x-ratelimit-limit-requests")
+        if remaining is not None and budget and int(budget) > 0:
+            if int(remaining) == 0:
+                self._pause(parse_reset(headers.get("x-ratelimit-reset-requests")) or 1.0)
+                return
+            if int(remaining) / int(budget) < self.headroom:
+                return
+        self.limit = min(self.maximum, self.limit + self.increase / max(self.limit, 1.0))
+
+    def on_rate_limited(self, headers: Optional[Mapping[str, str]] = None):
+        # 429s for requests already in flight during a pause are the same congestion event: cut once
+        if time.monotonic() >= self._paused_until:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            print(f"Rate limited: concurrency cut to {int(self.limit)}")
+        self._pause(retry_after(headers or {}) or 1.0)
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
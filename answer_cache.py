@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Optional
+
+ANSWER_CACHE_FILE = os.getenv("ANSWER_CACHE_FILE", ".answer_cache.sqlite")
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(30 * 24 * 60 * 60)))  # 0 asks everything again
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnswerCache:
+    """
+    Assistant answers kept across runs, so asking an unchanged assistant an
+    unchanged question is served locally.
+
+    Answers are keyed by a scope (assistant id, model, instructions and the
+    content fingerprints of its vector stores) plus the fully rendered
+    question. assistant_handler records a fingerprint of the files behind a
+    vector store with ``record_sources`` whenever it uploads data; a changed
+    fingerprint changes the scope, and ``invalidate`` drops the assistant's
+    old answers outright.
+    """
+
+    def __init__(self, path: str = ANSWER_CACHE_FILE, ttl: float = ANSWER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                assistant_id TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answers_assistant ON answers (assistant_id);
+            CREATE TABLE IF NOT EXISTS sources (
+                vector_store_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                files TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def scope(self, assistant_id: str, model: str, instructions: Optional[str],
+              vector_store_ids: Iterable[str]) -> str:
+        """Everything an answer depends on besides the question, as one string."""
+        with self._lock:
+            stores = {
+                store_id: (self._conn.execute("SELECT fingerprint FROM sources WHERE vector_store_id = ?",
+                                              (store_id,)).fetchone() or [None])[0]
+                for store_id in sorted(vector_store_ids)
+            }
+        return json.dumps({
+            "assistant_id": assistant_id,
+            "model": model,
+            "instructions": hashlib.sha256((instructions or "").encode("utf-8")).hexdigest(),
+            "vector_stores": stores,
+        }, sort_keys=True)
+
+    @staticmethod
+    def key(scope: str, question: str) -> str:
+        return hashlib.sha256(f"{scope}\n{question}".encode("utf-8")).hexdigest()
+
+    def get(self, scope: str, question: str) -> Optional[str]:
+        """The cached answer if it's younger than the TTL, else None."""
+        with self._lock:
+            row = self._conn.execute("SELECT answer, created_at FROM answers WHERE key = ?",
+                                     (self.key(scope, question),)).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, scope: str, question: str, answer: str):
+        assistant_id = json.loads(scope)["assistant_id"]
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                               (self.key(scope, question), assistant_id, question,
+                                zlib.compress(answer.encode("utf-8"), 6), time.time()))
+            self._conn.execute("DELETE FROM answers WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+
+    def record_sources(self, vector_store_id: str, file_hashes: Dict[str, str]) -> bool:
+        """
+        Records the content hashes of the files behind a vector store
+        (file name -> SHA-256). Returns whether they differ from the ones
+        recorded before, i.e. whether cached answers are now stale.
+        """
+        fingerprint = hashlib.sha256(json.dumps(sorted(file_hashes.values())).encode("utf-8")).hexdigest()
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint FROM sources WHERE vector_store_id = ?",
+                                     (vector_store_id,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+                               (vector_store_id, fingerprint, json.dumps(file_hashes), time.time()))
+            self._conn.commit()
+        return row is None or row[0] != fingerprint
+
+    def invalidate(self, assistant_id: Optional[str] = None) -> int:
+        """Drops the answers of ``assistant_id`` (every answer if None); returns how many."""
+        with self._lock:
+            if assistant_id is None:
+                deleted = self._conn.execute("DELETE FROM answers").rowcount
+            else:
+                deleted = self._conn.execute("DELETE FROM answers WHERE assistant_id = ?", (assistant_id,)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
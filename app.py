@@ -1,26 +1,269 @@
-import subprocess
+import argparse
+import ast
+import hashlib
+import json
+import os
+import runpy
 import sys
-# import os - removed this because we do not need venv_python if we run in a venv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
 from pathlib import Path # added this because we need to use Path to get the path to the venv's python executable
-
-# Path to your virtual environment's Python executable
-# venv_python = os.path.join("venv", "Scripts", "python.exe") -- removed this because we do not need venv_python if we run in a venv
+from typing import Dict, List, Set
 
 # Get directory containing this script
-SCRIPT_DIR = Path(__file__).parent 
+SCRIPT_DIR = Path(__file__).parent
+
+# Records, per stage, the hashes of its inputs, code and outputs from the last successful run
+MANIFEST_FILE = SCRIPT_DIR / ".pipeline_manifest.json"
+
+
+@dataclass
+class Stage:
+    """A pipeline step: the script to run plus the files it reads and writes."""
+    name: str
+    script: str
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+
+# Dependencies are derived from the files each stage reads and writes, so the
+# Yahoo and web-search scrapers only wait for companies.csv, not for SEC.
+# yahoo_scrapper.py writes yahoo_results_1.json; yahoo_results.json (what the
+# assistant uploads) is still promoted from it by hand.
+STAGES = [
+    Stage("sec_links", "sec_links_scrapper.py", ["companies.csv"], ["10k_links.csv"]),
+    Stage("sec", "sec_scrapper.py", ["10k_links.csv"], ["company_summary.json"]),
+    Stage("yahoo", "yahoo_scrapper.py", ["companies.csv"], ["yahoo_results_1.json"]),
+    Stage("web_search", "web_search.py", ["companies.csv"], ["stock_data.json"]),
+    # The vector store manifest holds the hash of every uploaded file, so the
+    # summarizer re-runs when the data changes even though the assistant
+    # (and assistant_id.txt) is reused
+    Stage("assistant", "openai/assistant_handler.py",
+          ["company_summary.json", "stock_data.json", "yahoo_results.json"],
+          ["assistant_id.txt", "vector_store_manifest.json"]),
+    Stage("summarizer", "openai/summarizer.py",
+          ["companies.csv", "assistant_id.txt", "vector_store_manifest.json"], ["market_research.xlsx"]),
+]
+
+
+def build_dependencies(stages: List[Stage]) -> Dict[str, Set[str]]:
+    """Map each stage name to the names of the stages that produce its inputs."""
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            producers[output] = stage.name
+
+    return {
+        stage.name: {producers[f] for f in stage.inputs if f in producers and producers[f] != stage.name}
+        for stage in stages
+    }
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_modules(script_path: Path, seen: Set[Path] = None) -> Set[Path]:
+    """The script plus every module next to it (or in the repo root) that it imports, recursively."""
+    seen = set() if seen is None else seen
+    if script_path in seen or not script_path.exists():
+        return seen
+    seen.add(script_path)
+
+    tree = ast.parse(script_path.read_text(encoding="utf-8"))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top = name.split(".")[0]
+            for base in (script_path.parent, SCRIPT_DIR):
+                candidate = base / f"{top}.py"
+                if candidate.exists():
+                    local_modules(candidate, seen)
+                    break
+    return seen
+
+
+def stage_fingerprint(stage: Stage) -> Dict:
+    """Hashes of everything that decides whether a stage's outputs are still valid."""
+    code = sorted(local_modules(SCRIPT_DIR / stage.script))
+    return {
+        "inputs": {f: file_hash(SCRIPT_DIR / f) for f in stage.inputs},
+        "code": {str(p.relative_to(SCRIPT_DIR)): file_hash(p) for p in code},
+        "outputs": {f: file_hash(SCRIPT_DIR / f) for f in stage.outputs},
+    }
+
+
+def read_manifest() -> Dict:
+    """Reads the build-cache manifest, treating a missing or corrupt file as empty."""
+    try:
+        with open(MANIFEST_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(manifest: Dict):
+    """Atomically replaces the build-cache manifest."""
+    tmp_path = MANIFEST_FILE.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_FILE)
+
 
-scripts = ["sec_links_scrapper.py", "sec_scrapper.py", "yahoo_scrapper.py", "web_search.py", "openai/assistant_handler.py", "openai/summarizer.py"]
-# scripts = ["openai/summarizer.py"]
+def is_up_to_date(stage: Stage, manifest: Dict) -> bool:
+    """A stage can be skipped if its inputs, code and outputs all match the last recorded run."""
+    recorded = manifest.get(stage.name)
+    if not recorded:
+        return False
+    current = stage_fingerprint(stage)
+    if any(h is None for h in current["outputs"].values()):
+        return False
+    return current == recorded
+
+
+def downstream_of(stages: List[Stage], roots: Set[str]) -> Set[str]:
+    """The given stages plus every stage that transitively depends on them."""
+    dependencies = build_dependencies(stages)
+    selected = set(roots)
+    changed = True
+    while changed:
+        changed = False
+        for name, upstream in dependencies.items():
+            if name not in selected and upstream & selected:
+                selected.add(name)
+                changed = True
+    return selected
+
+
+def run_stage(stage: Stage) -> bool:
+    """Runs a stage's script in this process as if it were launched as __main__."""
+    script_path = SCRIPT_DIR / stage.script
 
-for script in scripts:
-    print(f"Running {script}...")
-    script_path = SCRIPT_DIR / script
-    
     # Added for error handling
     if not script_path.exists():
         print(f"Error: Script not found: {script_path}")
-        continue
+        return False
+
+    print(f"Running {stage.script}...")
+    start = time.time()
+    try:
+        runpy.run_path(str(script_path), run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            print(f"{stage.script} exited with status {e.code}")
+            return False
+    print(f"Finished {stage.script} in {time.time() - start:.1f}s\n")
+    return True
+
+
+def run_pipeline(stages: List[Stage], max_workers: int = None, forced: Set[str] = frozenset()) -> bool:
+    """Runs stages as soon as all of their upstream stages have finished.
+
+    Stages whose inputs, code and outputs are unchanged since their last
+    successful run are skipped unless they are listed in ``forced``.
+    """
+    dependencies = build_dependencies(stages)
+    by_name = {stage.name: stage for stage in stages}
+    pending = set(by_name)
+    done, failed = set(), set()
+    manifest = read_manifest()
+    manifest_lock = threading.Lock()
+
+    def run_or_skip(stage: Stage) -> bool:
+        # Upstream stages have already finished here, so input hashes are final
+        if stage.name not in forced and is_up_to_date(stage, manifest):
+            print(f"Skipping {stage.script}: inputs, code and outputs unchanged")
+            return True
+        if not run_stage(stage):
+            return False
+        with manifest_lock:
+            manifest[stage.name] = stage_fingerprint(stage)
+            write_manifest(manifest)
+        return True
+
+    # Scripts import sibling modules the same way they would when started
+    # directly, so their directories need to be importable. Their own
+    # argument parsers must not see the pipeline's command line.
+    sys.argv = sys.argv[:1]
+    for stage in stages:
+        script_dir = str((SCRIPT_DIR / stage.script).parent)
+        if script_dir not in sys.path:
+            sys.path.append(script_dir)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages)) as executor:
+        running = {}
+        while pending or running:
+            for name in sorted(pending):
+                upstream = dependencies[name]
+                if upstream & failed:
+                    print(f"Skipping {name}: upstream stage failed ({', '.join(sorted(upstream & failed))})")
+                    pending.discard(name)
+                    failed.add(name)
+                elif upstream <= done:
+                    pending.discard(name)
+                    running[executor.submit(run_or_skip, by_name[name])] = name
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    ok = future.result()
+                except Exception as e:
+                    print(f"Stage {name} failed: {e}")
+                    ok = False
+                (done if ok else failed).add(name)
+
+    return not failed
+
+
+def parse_args():
+    stage_names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Run the market research pipeline.")
+    parser.add_argument("--force", action="append", default=[], choices=stage_names, metavar="STAGE",
+                        help="re-run STAGE even if it is up to date (repeatable)")
+    parser.add_argument("--since", action="append", default=[], choices=stage_names, metavar="STAGE",
+                        help="re-run STAGE and every stage downstream of it (repeatable)")
+    parser.add_argument("--run", nargs=argparse.REMAINDER, metavar="SCRIPT",
+                        help="run only SCRIPT (e.g. competitors/competitors_scraper.py) and its arguments, "
+                             "with the shared modules in the repo root importable")
+    return parser.parse_args()
+
+
+def run_script(script: str, argv: List[str]) -> bool:
+    """
+    Runs one script outside the pipeline. Scripts in subdirectories import
+    the shared modules from the repo root, which is on sys.path here but not
+    when they are started by path.
+    """
+    sys.path.append(str((SCRIPT_DIR / script).parent))
+    sys.argv = [script] + argv
+    return run_stage(Stage(Path(script).stem, script))
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.run:
+        sys.exit(0 if run_script(args.run[0], args.run[1:]) else 1)
+    forced = set(args.force) | downstream_of(STAGES, set(args.since))
 
-    # subprocess.run([venv_python, script], check=True) - reemoved this because we do not need venv_python if we run in a venv
-    subprocess.run([sys.executable, str(script_path)], check=True)
-    print(f"Finished {script}\n")
+    start = time.time()
+    ok = run_pipeline(STAGES, forced=forced)
+    print(f"Pipeline {'finished' if ok else 'failed'} in {time.time() - start:.1f}s")
+    sys.exit(0 if ok else 1)
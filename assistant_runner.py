@@ -0,0 +1,241 @@
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+from adaptive_concurrency import AdaptiveConcurrency, retry_after
+from answer_cache import AnswerCache
+
+# Questions in flight at the start, and the most the limiter may grow to
+INITIAL_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "4"))
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+MAX_RETRIES = 5  # Attempts per question, for 429s, 5xx, timeouts and connection errors
+RUN_TIMEOUT = 300  # Max wait for one run (5 minutes)
+BACKOFF_BASE = 1.0  # Seconds; doubles per attempt
+BACKOFF_MAX = 30.0
+RUN_END_EVENTS = {"thread.run.completed", "thread.run.failed", "thread.run.cancelled", "thread.run.expired",
+                  "thread.run.incomplete", "thread.run.requires_action"}
+
+
+class RunInterrupted(Exception):
+    """A run that ended without an answer for a transient reason (rate limit, stream error, dropped stream)."""
+
+
+# Failures worth another attempt; 429s are retried too, after the server's Retry-After
+RETRYABLE_ERRORS = (openai.InternalServerError, openai.APIConnectionError, httpx.TransportError, RunInterrupted)
+
+
+def backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: a random delay up to BACKOFF_BASE * 2^attempt, capped at BACKOFF_MAX."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def async_client() -> AsyncOpenAI:
+    """
+    An AsyncOpenAI client that leaves retries to AssistantRunner, so every 429
+    reaches the concurrency limiter. OPENAI_BASE_URL points it at another
+    server, e.g. fake_openai_server.py.
+    """
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+
+class AssistantRunner:
+    """
+    Asks an assistant many questions concurrently, each in its own thread,
+    reading every answer from the run's event stream as it's generated.
+    How many runs are in flight is decided by an AdaptiveConcurrency limiter
+    fed with every response's rate-limit headers and every 429.
+    """
+
+    def __init__(self, assistant_id: str, client: Optional[AsyncOpenAI] = None,
+                 limiter: Optional[AdaptiveConcurrency] = None, timeout: float = RUN_TIMEOUT,
+                 cache: Optional[AnswerCache] = None):
+        self.assistant_id = assistant_id
+        self.client = client or async_client()
+        self.limiter = limiter or AdaptiveConcurrency(initial=INITIAL_CONCURRENCY, maximum=MAX_CONCURRENCY)
+        self.timeout = timeout
+        self.cache = cache
+        self.cache_hits = 0
+        self.timings: List[Dict] = []  # Per question: first_token and total seconds, outcome
+        self._scope: Optional[str] = None
+        self._scope_lock = asyncio.Lock()
+
+    async def _call(self, request: Callable[[], Awaitable]):
+        """Sends one raw-response request and reports its outcome to the limiter; errors propagate."""
+        try:
+            raw = await request()
+        except openai.RateLimitError as e:
+            self.limiter.on_rate_limited(e.response.headers)
+            raise
+        self.limiter.on_success(raw.headers)
+        return raw.parse()
+
+    async def _retrying(self, attempt: Callable[[], Awaitable], what: str):
+        """
+        The one retry loop: runs ``attempt`` until it succeeds, retrying 429s
+        (after the server's Retry-After), 5xx, timeouts and dropped
+        connections with jittered exponential backoff. Other errors, 4xx
+        included, are raised at once.
+        """
+        for number in range(1, MAX_RETRIES + 1):
+            try:
+                return await attempt()
+            except openai.RateLimitError as e:
+                delay, error = retry_after(e.response.headers) or backoff(number), e
+            except RETRYABLE_ERRORS as e:
+                delay, error = backoff(number), e
+            if number < MAX_RETRIES:
+                print(f"Attempt {number} for {what} failed ({error}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        raise RuntimeError(f"Gave up on {what} after {MAX_RETRIES} attempts: {error}")
+
+    async def _cache_scope(self) -> Optional[str]:
+        """The answer cache scope of this assistant, looked up once; None turns the cache off."""
+        async with self._scope_lock:
+            if self._scope is None and self.cache is not None:
+                try:
+                    assistant = await self._retrying(lambda: self._call(
+                        lambda: self.client.beta.assistants.with_raw_response.retrieve(self.assistant_id)),
+                        "the assistant lookup")
+                except (RuntimeError, openai.APIError) as e:
+                    print(f"Answer cache disabled, couldn't look up the assistant: {e}")
+                    self.cache = None
+                    return None
+                file_search = assistant.tool_resources.file_search if assistant.tool_resources else None
+                self._scope = self.cache.scope(self.assistant_id, assistant.model, assistant.instructions,
+                                               (file_search.vector_store_ids or []) if file_search else [])
+            return self._scope
+
+    async def _stream_run(self, question: str, started: float, on_delta: Optional[Callable[[str], None]],
+                          live: Dict):
+        """
+        Creates a streamed run for ``question``; returns (final run event
+        data, answer text, seconds to first token). ``live`` gets the run's
+        id and thread as soon as the stream announces them, and "ended" once
+        the run is over, so a caller giving up early can cancel it. The
+        stream is closed however this returns, timeouts included.
+        """
+        # Thread, message and run in one request; the answer arrives as server-sent events
+        stream = await self._call(lambda: self.client.beta.threads.with_raw_response.create_and_run(
+            assistant_id=self.assistant_id,
+            thread={"messages": [{"role": "user", "content": question}]},
+            stream=True,
+        ))
+        run, parts, answer, first_token = None, [], None, None
+        try:
+            async for event in stream:
+                if event.event.startswith("thread.run.") and "id" not in live:
+                    live.update(id=event.data.id, thread_id=event.data.thread_id)
+                if event.event == "thread.message.delta":
+                    for block in event.data.delta.content or []:
+                        if block.type == "text" and block.text and block.text.value:
+                            if first_token is None:
+                                first_token = time.monotonic() - started
+                            parts.append(block.text.value)
+                            if on_delta:
+                                on_delta(block.text.value)
+                elif event.event == "thread.message.completed" and event.data.content:
+                    answer = event.data.content[0].text.value
+                elif event.event in RUN_END_EVENTS:
+                    run = event.data
+                    live["ended"] = True
+                elif event.event == "error":
+                    raise RunInterrupted(f"Stream error: {event.data.message}")
+        finally:
+            await stream.close()
+        return run, answer if answer is not None else "".join(parts), first_token
+
+    async def _cancel(self, live: Dict):
+        """Cancels a run we stopped waiting for, so it doesn't keep running (and billing) server-side."""
+        if "id" not in live or live.get("ended"):
+            return
+        try:
+            await self.client.beta.threads.runs.cancel(live["id"], thread_id=live["thread_id"])
+            print(f"Cancelled run {live['id']}")
+        except openai.APIError as e:
+            print(f"Couldn't cancel run {live['id']}: {e}")
+
+    async def _attempt(self, question: str, on_delta: Optional[Callable[[str], None]]) -> str:
+        """One run for ``question``, holding a limiter slot; retryable failures raise."""
+        async with self.limiter:
+            started = time.monotonic()
+            live = {}
+            try:
+                run, answer, first_token = await asyncio.wait_for(
+                    self._stream_run(question, started, on_delta, live), self.timeout)
+            except asyncio.TimeoutError:
+                print("Timeout reached! Skipping this request...")
+                await self._cancel(live)
+                self._record(question, None, started, "timeout")
+                return "ERROR: Timeout"
+            except Exception:
+                await self._cancel(live)  # Before any retry starts another run
+                raise
+
+            if run is None:
+                raise RunInterrupted("Stream closed before the run ended")
+            if run.status != "completed":
+                if run.last_error and run.last_error.code == "rate_limit_exceeded":
+                    self.limiter.on_rate_limited()
+                    raise RunInterrupted(f"Run {run.status}: {run.last_error.message}")
+                print(f"Run {run.status}: {run.last_error}")
+                self._record(question, first_token, started, "failed")
+                return "ERROR: Run failed"
+
+        self._record(question, first_token, started, "completed")
+        if not answer:
+            print("No messages found in thread!")
+            return "ERROR: No response received"
+        print(f"Received answer: {answer[:50]}...")  # Print only the first 50 chars
+        return answer
+
+    async def ask(self, question: str, on_delta: Optional[Callable[[str], None]] = None) -> str:
+        """
+        The assistant's answer, or an "ERROR: ..." string like the synchronous
+        code returned, also when the API rejects the question (4xx errors
+        other than 429 aren't retried, but don't stop the other questions).
+        ``on_delta`` is called with each piece of text as it streams in. Time
+        to first token and total latency go to ``timings``. Answers found in
+        the runner's cache are returned without a run.
+        """
+        scope = await self._cache_scope() if self.cache is not None else None
+        if scope is not None:
+            cached = self.cache.get(scope, question)
+            if cached is not None:
+                self.cache_hits += 1
+                return cached
+
+        try:
+            answer = await self._retrying(lambda: self._attempt(question, on_delta), "a question")
+        except RuntimeError as e:
+            print(f"Skipping question due to repeated failures: {question} ({e})")
+            return "ERROR: API failed"
+        except openai.APIError as e:
+            print(f"Skipping question rejected by the API: {question} ({e})")
+            return "ERROR: API failed"
+        if scope is not None and not answer.startswith("ERROR:"):
+            self.cache.put(scope, question, answer)
+        return answer
+
+    def _record(self, question: str, first_token: Optional[float], started: float, outcome: str):
+        self.timings.append({"question": question, "first_token": first_token,
+                             "total": time.monotonic() - started, "outcome": outcome})
+
+    def timing_summary(self) -> Dict:
+        """Answer count with mean/max time to first token and total latency, in seconds."""
+        first_tokens = [t["first_token"] for t in self.timings if t["first_token"] is not None]
+        totals = [t["total"] for t in self.timings]
+        if not totals:
+            return {"count": 0}
+        return {
+            "count": len(totals),
+            "first_token_mean": sum(first_tokens) / len(first_tokens) if first_tokens else None,
+            "first_token_max": max(first_tokens, default=None),
+            "total_mean": sum(totals) / len(totals),
+            "total_max": max(totals),
+        }
@@ -0,0 +1,138 @@
+"""
+Compares extracting a page's paragraph text the old way (find_elements +
+`.text` per element) with dom_extract's single execute_script call.
+
+By default this is a round-trip model: a fake driver charges a fixed latency
+per WebDriver command, so the times only show what the saved round-trips are
+worth; it says nothing about whether both methods return the same text.
+
+    python benchmark_dom_extract.py --latency-ms 2
+
+With --browser, both methods run against a generated article page in a real
+headless Chrome (hidden, blank and nested paragraphs included), their
+outputs are checked to be identical and real timings are reported.
+
+    python benchmark_dom_extract.py --browser
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from dom_extract import page_texts
+
+
+class FakeElement:
+    def __init__(self, driver, text):
+        self._driver = driver
+        self._text = text
+
+    @property
+    def text(self):
+        self._driver.command()
+        return self._text
+
+
+class FakeDriver:
+    """Stands in for a Chrome WebDriver: every call is one HTTP round-trip to chromedriver."""
+
+    def __init__(self, paragraphs, latency):
+        self.paragraphs = paragraphs
+        self.latency = latency
+        self.round_trips = 0
+
+    def command(self):
+        self.round_trips += 1
+        time.sleep(self.latency)
+
+    def find_elements(self, by, value):
+        self.command()
+        return [FakeElement(self, text) for text in self.paragraphs]
+
+    def execute_script(self, script, *args):
+        self.command()
+        return json.dumps({"title": "", "h1": None, "texts": [t.strip() for t in self.paragraphs if t.strip()],
+                           "headings": [], "time": None})
+
+
+def per_element(driver):
+    paragraphs = driver.find_elements("tag name", "p")
+    return " ".join([p.text for p in paragraphs if p.text.strip()])
+
+
+def single_script(driver):
+    return " ".join(page_texts(driver))
+
+
+METHODS = [("per-element", per_element), ("single-script", single_script)]
+
+
+def article_html(size):
+    """An article with blank, hidden, nested and multi-line paragraphs among ordinary ones."""
+    paragraphs = []
+    for i in range(size):
+        if i % 10 == 0:
+            paragraphs.append("<p>   </p>")
+        elif i % 10 == 3:
+            paragraphs.append(f"<p style='display:none'>Hidden paragraph {i}.</p>")
+        elif i % 10 == 7:
+            paragraphs.append(f"<div><p>Nested <b>paragraph</b> {i},<br>on two lines.</p></div>")
+        else:
+            paragraphs.append(f"<p>  Paragraph {i} of the  article. </p>")
+    return f"<html><head><title>Benchmark</title></head><body><h1>Article</h1>{''.join(paragraphs)}</body></html>"
+
+
+def model(sizes, latency):
+    print("Round-trip model: fake driver, fixed latency per command; outputs are not compared")
+    print(f"{'paragraphs':>10} {'method':>14} {'round-trips':>12} {'seconds':>8}")
+    for size in sizes:
+        paragraphs = [f"Paragraph {i} of the article." if i % 10 else "   " for i in range(size)]
+        for name, extract in METHODS:
+            driver = FakeDriver(paragraphs, latency)
+            started = time.perf_counter()
+            extract(driver)
+            elapsed = time.perf_counter() - started
+            print(f"{size:>10} {name:>14} {driver.round_trips:>12} {elapsed:>8.3f}")
+
+
+def browser(sizes):
+    from browser_pool import create_driver
+
+    print("Headless Chrome: both methods on the same page; outputs must match")
+    print(f"{'paragraphs':>10} {'method':>14} {'seconds':>8}")
+    driver = create_driver()
+    try:
+        for size in sizes:
+            with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False, encoding="utf-8") as f:
+                f.write(article_html(size))
+            try:
+                driver.get(f"file://{f.name}")
+                outputs = []
+                for name, extract in METHODS:
+                    started = time.perf_counter()
+                    outputs.append(extract(driver))
+                    print(f"{size:>10} {name:>14} {time.perf_counter() - started:>8.3f}")
+                assert outputs[0] == outputs[1], f"extraction methods disagree on a {size}-paragraph page"
+            finally:
+                os.unlink(f.name)
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-element and single-script paragraph extraction.")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="simulated cost of one WebDriver command")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 800], help="paragraphs per page")
+    parser.add_argument("--browser", action="store_true",
+                        help="run both methods in headless Chrome and check they return the same text")
+    args = parser.parse_args()
+
+    if args.browser:
+        browser(args.sizes)
+    else:
+        model(args.sizes, args.latency_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
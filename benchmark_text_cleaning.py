@@ -0,0 +1,117 @@
+"""
+Checks that text_cleaning produces exactly what the original clean_text and
+clean_article_content did, and times both, over the scraped corpora in
+stock_data.json and yahoo_results.json plus randomly generated documents
+built from the fragments the patterns look for.
+
+    python benchmark_text_cleaning.py --repeat 5
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+import text_cleaning
+
+
+def original_clean_text(text):
+    if not text:
+        return ""
+
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    irrelevant_phrases = [
+        "sign up", "subscribe to continue", "get full access",
+        "create a free account", "already have an account",
+        "log in to access", "start your free trial", "cookie policy"
+    ]
+    for phrase in irrelevant_phrases:
+        text = text.replace(phrase, '')
+
+    return text
+
+
+def original_clean_article_content(text):
+    patterns_to_remove = [
+        r'\([^)]*thousands[^)]*\)',
+        r'(?s)As of.*?Assets',
+        r'(?s)Current assets:.*?Total current assets',
+        r'(?s)Stockholders.[^ ]*\s*Equity:.*?Total stockholders.[^ ]*\s*equity',
+        r'(?s)Condensed Consolidated Statements.*?\d{4}',
+        r'\$\s*\d{1,3}(?:,\d{3})*(?:\.\d+)?',
+        r'\d{1,3}(?:,\d{3})*(?:\.\d+)?%?'
+    ]
+
+    cleaned_text = text
+    for pattern in patterns_to_remove:
+        cleaned_text = re.sub(pattern, '', cleaned_text)
+
+    cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
+    return cleaned_text.strip()
+
+
+FRAGMENTS = [
+    "As of", "Assets", "Current assets:", "Total current assets", "Stockholders'", "Stockholders’ Equity:",
+    "Total stockholders' equity", "Total stockholders’ equity", "Condensed Consolidated Statements",
+    "(in thousands)", "(", ")", "thousands", "$", "$ ", "1", "12", "123", "1,234", ",", ".", "5.5", "%",
+    "2024", " ", "  ", "\n", "\t", "word", "sign up", "sign ", "up", "get full access", "access", "s",
+    "log in to ", "cookie policy", "cookie ", "policy", "start your free trial", "subscribe to continue",
+    "create a free account", "already have an account", "Equity:", "equity",
+]
+
+
+def fuzz_documents(count, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 60))) for _ in range(count)]
+
+
+def corpus():
+    texts = []
+    with open("stock_data.json", encoding="utf-8") as f:
+        texts += [record["Extracted Text"] for record in json.load(f)]
+    with open("yahoo_results.json", encoding="utf-8") as f:
+        texts += [article["content"] for articles in json.load(f).values() for article in articles]
+    return texts
+
+
+def timed(func, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        outputs = [func(text) for text in texts]
+        best = min(best, time.perf_counter() - started)
+    return outputs, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify and time text_cleaning against the original cleaners.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fuzz", type=int, default=20000, help="random documents to compare")
+    args = parser.parse_args()
+
+    texts = corpus()
+    # Worst case for the lazy spans: a long article with many starts and no end
+    adversarial = [("As of today the company said. " * 3000) + ("Condensed Consolidated Statements x " * 300)]
+    suites = [("corpus", texts), ("adversarial", adversarial), ("fuzz", fuzz_documents(args.fuzz))]
+
+    print(f"{'cleaner':<22} {'suite':<12} {'docs':>6} {'MB':>6} {'original s':>11} {'new s':>8} {'speedup':>8}")
+    for name, original, new in [
+        ("clean_text", original_clean_text, text_cleaning.clean_text),
+        ("clean_article_content", original_clean_article_content, text_cleaning.clean_article_content),
+    ]:
+        for suite, docs in suites:
+            repeat = 1 if suite == "adversarial" else args.repeat
+            expected, original_time = timed(original, docs, repeat)
+            actual, new_time = timed(new, docs, repeat)
+            mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if a != b]
+            if mismatches:
+                raise SystemExit(f"{name} differs on {suite} document {mismatches[0]}: {docs[mismatches[0]]!r}")
+            size = sum(len(doc) for doc in docs) / 1e6
+            print(f"{name:<22} {suite:<12} {len(docs):>6} {size:>6.1f} {original_time:>11.3f} {new_time:>8.3f} "
+                  f"{original_time / new_time:>7.1f}x")
+    print("Outputs identical.")
+
+
+if __name__ == "__main__":
+    main()
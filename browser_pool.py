@@ -0,0 +1,288 @@
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+# Upper bound on Chrome instances alive at once across every scraper in the process
+POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+# Instances started up front so the first borrower doesn't pay Chrome's startup
+POOL_WARM = int(os.getenv("BROWSER_POOL_WARM", "1"))
+# Chrome's memory grows with every page; replace an instance after this many loads
+MAX_PAGES_PER_DRIVER = int(os.getenv("BROWSER_MAX_PAGES", "50"))
+HEADLESS = os.getenv("BROWSER_HEADLESS", "1") != "0"
+
+# Resource classes blocked in every scraper browser ("none" blocks nothing); we only read text
+BLOCK = os.getenv("BROWSER_BLOCK", "images,fonts,media,trackers")
+
+BLOCKED_URL_PATTERNS = {
+    "images": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"],
+    "fonts": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.m4a", "*.ogg"],
+    "trackers": [
+        "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*", "*google-analytics.com*",
+        "*googletagmanager.com*", "*googletagservices.com*", "*amazon-adsystem.com*", "*adsafeprotected.com*",
+        "*moatads.com*", "*scorecardresearch.com*", "*taboola.com*", "*outbrain.com*", "*criteo.com*",
+        "*criteo.net*", "*chartbeat.com*", "*chartbeat.net*", "*hotjar.com*", "*connect.facebook.net*",
+        "*quantserve.com*", "*adnxs.com*", "*rubiconproject.com*", "*pubmatic.com*", "*casalemedia.com*",
+    ],
+}
+
+
+def blocked_classes(block: str = BLOCK) -> frozenset:
+    classes = frozenset(c.strip() for c in block.split(",") if c.strip()) - {"none"}
+    unknown = classes - BLOCKED_URL_PATTERNS.keys()
+    if unknown:
+        raise ValueError(f"Unknown BROWSER_BLOCK classes: {sorted(unknown)}")
+    return classes
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+
+
+@lru_cache(maxsize=None)
+def chromedriver_path() -> Optional[str]:
+    """
+    Resolves the chromedriver binary once per process. Returns None to let
+    Selenium Manager find a driver if webdriver-manager can't.
+    """
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"webdriver-manager failed ({e}); falling back to Selenium Manager")
+        return None
+
+
+def chrome_options(headless: bool = HEADLESS, block: Iterable[str] = ()) -> Options:
+    """The option set shared by every scraper."""
+    options = Options()
+    # driver.get returns at DOMContentLoaded; page_ready decides when the page is usable
+    options.page_load_strategy = "eager"
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--ignore-certificate-errors")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--mute-audio")
+    options.add_argument("--autoplay-policy=user-gesture-required")
+    options.add_argument("--disable-blink-features=AutomationControlled")  # Avoid detection
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    # CDP Network events for page_ready's network-idle detection
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    # Content settings stop images at the renderer; notifications prompts are never wanted
+    prefs = {"profile.default_content_setting_values.notifications": 2}
+    if "images" in block:
+        prefs["profile.managed_default_content_settings.images"] = 2
+    options.add_experimental_option("prefs", prefs)
+    return options
+
+
+def apply_stealth(driver: webdriver.Chrome):
+    """selenium-stealth's fingerprint overrides, as investing_scrapper used to apply them to its own driver."""
+    from selenium_stealth import stealth
+    stealth(driver,
+        languages=["en-US", "en"],
+        vendor="Google Inc.",
+        platform="Win32",
+        webgl_vendor="Intel Inc.",
+        renderer="Intel Iris OpenGL Engine",
+        fix_hairline=True,
+    )
+
+
+def create_driver(block: str = BLOCK, stealth: bool = False) -> webdriver.Chrome:
+    """
+    Starts a Chrome instance configured like the scrapers used to configure
+    their own, with the ``block`` resource classes (see BLOCKED_URL_PATTERNS)
+    refused before they reach the network, and selenium-stealth applied if
+    ``stealth``.
+    """
+    classes = blocked_classes(block)
+    path = chromedriver_path()
+    service = Service(path) if path else Service()
+    driver = webdriver.Chrome(service=service, options=chrome_options(block=classes))
+    driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": USER_AGENT})
+    if classes:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {
+            "urls": [pattern for c in sorted(classes) for pattern in BLOCKED_URL_PATTERNS[c]]
+        })
+    # Hide navigator.webdriver on every page, not just the one currently loaded
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {
+        "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
+    if stealth:
+        apply_stealth(driver)
+    return driver
+
+
+class InstanceBudget:
+    """
+    Caps the Chrome instances alive at once, idle or borrowed, across every
+    pool sharing it. When it's spent, a pool that needs a new instance
+    closes an idle one of another pool before waiting.
+    """
+
+    def __init__(self, size: int = POOL_SIZE):
+        self.size = size
+        self.live = 0
+        self.pools = []
+        self.changed = threading.Condition()  # Guards live and every sharing pool's idle list
+
+
+class DriverPool:
+    """
+    A bounded pool of Chrome instances that scrapers borrow instead of
+    starting their own. Drivers are health-checked before reuse and replaced
+    after ``max_pages`` page loads to keep memory in check.
+
+    Every driver of a pool is set up the same way (``block``, ``stealth``),
+    so a borrower never gets an instance another scraper reconfigured.
+    Pools can share a ``budget`` to bound their live instances together.
+    """
+
+    def __init__(self, size: int = POOL_SIZE, max_pages: int = MAX_PAGES_PER_DRIVER, warm: int = POOL_WARM,
+                 block: str = BLOCK, stealth: bool = False, budget: Optional[InstanceBudget] = None):
+        self.max_pages = max_pages
+        self.block = block
+        self.stealth = stealth
+        self._budget = budget or InstanceBudget(size)
+        self._idle = []  # Most recently returned last, so warm instances get reused
+        self._pages = {}
+        self._lock = threading.Lock()
+        with self._budget.changed:
+            self._budget.pools.append(self)
+        for _ in range(warm):
+            with self._budget.changed:
+                if self._budget.live >= self._budget.size:
+                    break
+                self._budget.live += 1
+            driver = self._start()
+            with self._budget.changed:
+                self._idle.append(driver)
+
+    def _start(self) -> webdriver.Chrome:
+        """Starts a driver in a slot of the budget the caller already took."""
+        try:
+            driver = create_driver(self.block, self.stealth)
+        except BaseException:
+            self._release_slot()
+            raise
+        original_get = driver.get
+
+        def counted_get(url):
+            with self._lock:
+                self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            return original_get(url)
+
+        driver.get = counted_get
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _retire(self, driver: webdriver.Chrome):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._budget.changed:
+            self._budget.live -= 1
+            self._budget.changed.notify_all()
+
+    @staticmethod
+    def _healthy(driver: webdriver.Chrome) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _worn_out(self, driver: webdriver.Chrome) -> bool:
+        with self._lock:
+            return self._pages.get(id(driver), 0) >= self.max_pages
+
+    def _idle_elsewhere(self):
+        """The least recently used idle driver of another pool sharing the budget, and its pool."""
+        for pool in self._budget.pools:
+            if pool is not self and pool._idle:
+                return pool, pool._idle.pop(0)
+        return None
+
+    def _checkout(self) -> webdriver.Chrome:
+        while True:
+            driver = victim = None
+            with self._budget.changed:
+                while True:
+                    if self._idle:
+                        driver = self._idle.pop()
+                        break
+                    if self._budget.live < self._budget.size:
+                        self._budget.live += 1
+                        break
+                    victim = self._idle_elsewhere()
+                    if victim is not None:
+                        break
+                    self._budget.changed.wait()
+            if victim is not None:
+                pool, idle_driver = victim
+                pool._retire(idle_driver)
+            elif driver is None:
+                return self._start()
+            elif not self._worn_out(driver) and self._healthy(driver):
+                return driver
+            else:
+                self._retire(driver)
+
+    @contextmanager
+    def borrow(self):
+        """Lends a driver for the duration of a ``with`` block, blocking while the budget is spent."""
+        driver = self._checkout()
+        try:
+            yield driver
+        finally:
+            if self._worn_out(driver) or not self._healthy(driver):
+                self._retire(driver)
+            else:
+                with self._budget.changed:
+                    self._idle.append(driver)
+                    self._budget.changed.notify_all()
+
+    def close(self):
+        while True:
+            with self._budget.changed:
+                if not self._idle:
+                    return
+                driver = self._idle.pop()
+            self._retire(driver)
+
+
+_pools = {}
+_pool_lock = threading.Lock()
+_pool_budget = InstanceBudget(POOL_SIZE)  # POOL_SIZE bounds the live plain and stealth drivers together
+
+
+def get_pool(stealth: bool = False) -> DriverPool:
+    """
+    The process-wide pool, shared by every scraper (and every pipeline stage
+    run in-process); ``stealth`` gives the separate pool of selenium-stealth
+    drivers.
+    """
+    with _pool_lock:
+        if stealth not in _pools:
+            _pools[stealth] = DriverPool(stealth=stealth, budget=_pool_budget, warm=0 if stealth else POOL_WARM)
+            atexit.register(_pools[stealth].close)
+        return _pools[stealth]
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Optional
+
+CHECKPOINT_DIR = ".checkpoints"
+
+
+def atomic_write(path: str, text: str):
+    """Writes ``text`` to a temporary file next to ``path`` and renames it over ``path`` once it's on disk."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Checkpoint:
+    """
+    Completed work units of a long run (one answer, one search, one ticker),
+    persisted atomically after each one so a rerun after a crash or Ctrl-C
+    picks up where the last one stopped.
+
+    ``run_id`` identifies what the results depend on (e.g. the assistant
+    answering the questions); a checkpoint left by a different run is
+    discarded. ``finish`` deletes the checkpoint once the stage's real output
+    has been written, so the next run starts from scratch.
+    """
+
+    def __init__(self, name: str, run_id: Optional[str] = None, directory: str = CHECKPOINT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.json")
+        self.run_id = run_id
+        self.units = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("run_id") == run_id:
+                self.units = saved["units"]
+                print(f"Resuming from {self.path}: {len(self.units)} units already done")
+            else:
+                print(f"Ignoring {self.path}: it belongs to another run")
+
+    def __contains__(self, unit: str) -> bool:
+        return unit in self.units
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def get(self, unit: str, default: Any = None) -> Any:
+        return self.units.get(unit, default)
+
+    def save(self, unit: str, result: Any):
+        """Records ``unit`` as done with ``result`` (anything JSON-serializable)."""
+        self.save_many({unit: result})
+
+    def save_many(self, results: dict):
+        """Records several units in one write."""
+        with self._lock:
+            self.units.update(results)
+            atomic_write(self.path, json.dumps({"run_id": self.run_id, "units": self.units}, ensure_ascii=False))
+
+    def finish(self):
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
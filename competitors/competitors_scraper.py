@@ -3,47 +3,49 @@ import time
 import csv
 import re
 import json
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.support import expected_conditions as EC
 import random
 import datetime
 
-# Configure Selenium WebDriver for headless mode
-chrome_options = Options()
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option("useAutomationExtension", False)
+from browser_pool import get_pool
+from dom_extract import page_texts
+from page_ready import wait_for_page, Pacer
+from page_store import get_page_store
+from jsonl_sink import JsonlSink, compact_legacy
 
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Google blocks clients that search too often; keep 10-20 s between queries
+GOOGLE_PACER = Pacer("google.pacing", lambda: random.uniform(10, 20))
 
 def search_google(query, max_links=5):
     """Fetch search result URLs using Google Search via Selenium."""
     search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-    driver.get(search_url)
-    time.sleep(random.uniform(3, 6))
+    with get_pool().borrow() as driver:
+        driver.get(search_url)
+        wait_for_page(driver, "google.results", until=EC.presence_of_element_located((By.CSS_SELECTOR, "div.yuRUbf a")))
 
-    search_results = driver.find_elements(By.CSS_SELECTOR, "div.yuRUbf a")
-    links = [result.get_attribute("href") for result in search_results if result.get_attribute("href")]
+        search_results = driver.find_elements(By.CSS_SELECTOR, "div.yuRUbf a")
+        links = [result.get_attribute("href") for result in search_results if result.get_attribute("href")]
     valid_links = [link for link in links if "google.com" not in link]
 
     return valid_links[:max_links]
 
 def extract_competitors(page_url):
     """Extract competitor names from the given page URL."""
-    driver.get(page_url)
-    time.sleep(random.uniform(3, 6))  # Wait for the page to load
+    store = get_page_store()
+    stored = store.get_fresh(page_url, view="competitor_blocks")
+    if stored is not None:
+        texts = json.loads(stored.text)
+    else:
+        with get_pool().borrow() as driver:
+            driver.get(page_url)
+            wait_for_page(driver, "competitors.page")
+
+            texts = page_texts(driver, "body p, body li, body h2, body h3")
+        store.put(page_url, json.dumps(texts), view="competitor_blocks", source="browser")
 
     competitors = []
-    elements = driver.find_elements(By.XPATH, "//body//p | //body//li | //body//h2 | //body//h3")
-
-    for element in elements:
-        text = element.text.strip()
+    for text in texts:
         if any(keyword in text.lower() for keyword in ["competitors", "rivals", "similar companies", "competing companies"]):
             # Extract competitor names, assuming they might be listed in the same element or context
             competitors += [name.strip() for name in text.split(',') if name.strip()]
@@ -62,14 +64,16 @@ def main():
                     companies.append(company_name)
                     tickers.append(ticker)
 
-    # Updated query to search specifically for competitors
-    results = {}
+    # One record per company, appended as it's done; a rerun after a crash skips finished companies
+    sink = JsonlSink("competitors.jsonl", ("company",))
 
     for company, ticker in zip(companies, tickers):
+        if sink.has(company):
+            continue
         print(f"\n=== Searching for competitors of: {company} ({ticker}) ===\n")
         query = f"{company} competitors"
         
-        time.sleep(random.uniform(10, 20))
+        GOOGLE_PACER.wait()
         print(f"Searching: {query}")
         links = search_google(query, max_links=5)
 
@@ -78,14 +82,14 @@ def main():
         for link in links:
             competitors.update(extract_competitors(link))
 
-        results[company] = [{"name": competitor.split('(')[0].strip(), "ticker": competitor.split('(')[1].replace(')', '').strip() if '(' in competitor else ""} for competitor in competitors]
+        sink.write({"company": company, "competitors": [{"name": competitor.split('(')[0].strip(), "ticker": competitor.split('(')[1].replace(')', '').strip() if '(' in competitor else ""} for competitor in competitors]})
+    sink.close()
 
-    # Save results to a JSON file
-    with open("competitors.json", "w", encoding="utf-8") as json_file:
-        json.dump(results, json_file, ensure_ascii=False, indent=4)
+    # Save results to a JSON file, then mark the stream complete
+    compact_legacy("competitors.jsonl")
+    sink.mark_complete()
 
     print("Competitor extraction complete. Data saved to competitors.json.")
-    driver.quit()
 
 if __name__ == "__main__":
     main()
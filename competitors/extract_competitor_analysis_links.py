@@ -1,26 +1,19 @@
 import json
 import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
 
-# Initialize Selenium WebDriver (Head Mode)
-def init_driver():
-    options = Options()
-    options.add_argument("start-maximized")  # Open in full screen
-    options.add_argument("--disable-blink-features=AutomationControlled")
+from browser_pool import get_pool
+from page_ready import wait_for_page, Pacer
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+# Pause to prevent bot detection
+GOOGLE_PACER = Pacer("google.pacing", lambda: 2)
 
 # Function to perform Google search and extract top result links
 def google_search_links(driver, query):
     search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
+    GOOGLE_PACER.wait()
     driver.get(search_url)
-    time.sleep(3)  # Allow time for results to load
+    wait_for_page(driver, "google.results")
 
     links = []
     search_results = driver.find_elements(By.CSS_SELECTOR, "a[href^='http']")
@@ -36,8 +29,6 @@ def google_search_links(driver, query):
 
 # Main function to extract links for specific queries
 def extract_links(input_file, output_file):
-    driver = init_driver()
-
     with open(input_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
@@ -53,23 +44,21 @@ def extract_links(input_file, output_file):
 
             print(f"Extracting links for {name} ({ticker})...")
 
-            competitor_data = {
-                "name": name,
-                "ticker": ticker,
-                "products_and_services": google_search_links(driver, f"{name} products and services"),
-                "primary_markets": google_search_links(driver, f"{name} primary markets"),
-                "submarkets": google_search_links(driver, f"{name} submarkets"),
-                "market_size_units": google_search_links(driver, f"{name} market size in units"),
-                "market_size_dollars": google_search_links(driver, f"{name} market size in dollars"),
-                "growth_forecast": google_search_links(driver, f"{name} growth forecast"),
-                "key_positive_factors": google_search_links(driver, f"{name} key positive factors affecting growth"),
-                "key_negative_factors": google_search_links(driver, f"{name} key negative factors affecting growth"),
-            }
+            with get_pool().borrow() as driver:
+                competitor_data = {
+                    "name": name,
+                    "ticker": ticker,
+                    "products_and_services": google_search_links(driver, f"{name} products and services"),
+                    "primary_markets": google_search_links(driver, f"{name} primary markets"),
+                    "submarkets": google_search_links(driver, f"{name} submarkets"),
+                    "market_size_units": google_search_links(driver, f"{name} market size in units"),
+                    "market_size_dollars": google_search_links(driver, f"{name} market size in dollars"),
+                    "growth_forecast": google_search_links(driver, f"{name} growth forecast"),
+                    "key_positive_factors": google_search_links(driver, f"{name} key positive factors affecting growth"),
+                    "key_negative_factors": google_search_links(driver, f"{name} key negative factors affecting growth"),
+                }
 
             extracted_links[company].append(competitor_data)
-            time.sleep(2)  # Pause to prevent bot detection
-
-    driver.quit()
 
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(extracted_links, f, ensure_ascii=False, indent=4)
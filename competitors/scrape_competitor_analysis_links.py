@@ -3,46 +3,19 @@ import time
 import json
 import re
 import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException
 from urllib.parse import urlparse
 
-# Configure Selenium WebDriver for headless mode
-chrome_options = Options()
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--headless=new")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option("useAutomationExtension", False)
-
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+from browser_pool import get_pool
+from page_extractor import extract_dated_text, iso_date
+from dom_extract import extract_page
+from text_cleaning import clean_text
+from page_ready import wait_for_page
+from jsonl_sink import JsonlSink, compact_legacy
 
 CURRENT_DATE = datetime.datetime.now().strftime("%Y-%m-%d")
 
 
-def clean_text(text):
-    """Cleans extracted text by removing unnecessary content."""
-    if not text:
-        return ""
-
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    irrelevant_phrases = [
-        "sign up", "subscribe to continue", "get full access",
-        "create a free account", "already have an account",
-        "log in to access", "start your free trial", "cookie policy"
-    ]
-    for phrase in irrelevant_phrases:
-        text = text.replace(phrase, '')
-
-    return text
-
-
 def extract_source_name(url):
     """Extracts the domain name from a URL."""
     parsed_url = urlparse(url)
@@ -50,35 +23,43 @@ def extract_source_name(url):
 
 
 def scrape_page(url, retries=3):
-    """Extracts text from a webpage while handling popups and cookies."""
+    """
+    (date, text) of a webpage, rendering it in Chrome only when the static HTML has too little text.
+    The date is the page's own publication date, today if it doesn't show one.
+    """
     if not url or not isinstance(url, str):
         return CURRENT_DATE, ""
 
-    driver.set_page_load_timeout(60)  # Set timeout for page loading
+    # main() keeps pages with more than 1000 characters
+    page_date, text = extract_dated_text(url, lambda url: scrape_page_with_browser(url, retries),
+                                         clean_text, min_length=1000)
+    return page_date or CURRENT_DATE, text
 
+def scrape_page_with_browser(url, retries=3):
+    """Extracts (date, text) from a webpage while handling popups and cookies; the date is None if the page has none."""
     for attempt in range(retries):
         try:
-            driver.get(url)
-            time.sleep(3)  # Wait for the page to load
-
-            paragraphs = driver.find_elements(By.TAG_NAME, "p")
-            text_content = " ".join([p.text for p in paragraphs if p.text.strip()])
-            text_content = clean_text(text_content)
+            with get_pool().borrow() as driver:
+                driver.set_page_load_timeout(60)  # Set timeout for page loading
+                driver.get(url)
+                wait_for_page(driver, "competitor_analysis.page")
 
-            return CURRENT_DATE, text_content  # Return date and cleaned text
+                page = extract_page(driver)
+            return iso_date(page["time"]), clean_text(" ".join(page["texts"]))  # Return date and cleaned text
 
         except TimeoutException:
             print(f"Timeout while loading {url}. Retrying... (Attempt {attempt + 1})")
-            time.sleep(2)  # Wait before retrying
-            if attempt == retries - 1:
-                return CURRENT_DATE, ""
+            if attempt < retries - 1:
+                time.sleep(2)  # Wait before retrying
         except Exception as e:
             print(f"Error scraping {url}: {e}")
-            return CURRENT_DATE, ""
+            break
+    return None, ""
 
 
 def main():
-    results = []
+    # Records are appended as pages are scraped; a rerun after a crash skips fields already done
+    sink = JsonlSink("competitors/competitors_data.jsonl", ("Parent Company", "Company Name", "Field", "Source URL"))
 
     # Read extracted links from the JSON file
     with open("./competitors/extracted_links.json", mode="r", encoding="utf-8") as file:
@@ -100,11 +81,13 @@ def main():
 
             for field in all_link_fields:
                 links = competitor.get(field, [])
-                successful_scrapes = 0
+                successful_scrapes = sink.count(company_name, name, field)
 
                 for link in links:
                     if successful_scrapes >= 3:
                         break  # Stop scraping this field after 3 successful scrapes
+                    if sink.has(company_name, name, field, link):
+                        continue
 
                     print(f"Scraping: {link} for {name} ({ticker}) - {field}")
                     page_date, text = scrape_page(link)
@@ -122,15 +105,15 @@ def main():
                             "Field": field,
                             "Parent Company": company_name  # Add context about which company the competitor belongs to
                         }
-                        results.append(result)
+                        sink.write(result)
                         successful_scrapes += 1
+    sink.close()
 
-    # Save results to JSON file
-    with open("./competitors/competitors_data.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4)
+    # Save results to JSON file, then mark the stream complete
+    compact_legacy("competitors/competitors_data.jsonl")
+    sink.mark_complete()
 
     print("Scraping complete. Data saved to competitors_data.json.")
-    driver.quit()
 
 
 if __name__ == "__main__":
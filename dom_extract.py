@@ -0,0 +1,50 @@
+import json
+from typing import Dict, List
+
+# Runs inside the page and returns everything the scrapers read as one JSON
+# string, so a page costs a single WebDriver round-trip instead of one
+# find_elements call plus one `.text` call per element.
+EXTRACT_SCRIPT = """
+const selector = arguments[0];
+const first = arguments[1];
+const visibleText = (el) => {
+    // WebElement.text only returns rendered text; innerText of a hidden element would not be empty
+    const visible = el.checkVisibility ? el.checkVisibility() : el.getClientRects().length > 0;
+    return visible ? el.innerText.trim() : "";
+};
+const texts = [];
+const matches = first ? [document.querySelector(selector)].filter(Boolean) : document.querySelectorAll(selector);
+for (const el of matches) {
+    const text = visibleText(el);
+    if (text) texts.push(text);
+}
+const headings = [];
+for (const el of document.querySelectorAll("h1, h2, h3")) {
+    const text = visibleText(el);
+    if (text) headings.push(text);
+}
+const h1 = document.querySelector("h1");
+const time = document.querySelector("time[datetime]");
+return JSON.stringify({
+    title: document.title,
+    h1: h1 ? visibleText(h1) : null,
+    texts: texts,
+    headings: headings,
+    time: time ? time.getAttribute("datetime") : null,
+});
+"""
+
+
+def extract_page(driver, selector: str = "p", first: bool = False) -> Dict:
+    """
+    Text of every visible element matching ``selector`` (in document order,
+    empty ones dropped; with ``first``, of the first match only, like
+    ``find_element``), the page's h1-h3 headings, its <title>, the text of
+    its first <h1> and the first <time datetime>, fetched with one
+    ``execute_script`` call.
+    """
+    return json.loads(driver.execute_script(EXTRACT_SCRIPT, selector, first))
+
+
+def page_texts(driver, selector: str = "p", first: bool = False) -> List[str]:
+    return extract_page(driver, selector, first)["texts"]
@@ -0,0 +1,46 @@
+import json
+import os
+import zipfile
+from typing import Dict, Iterable, Iterator, Tuple
+
+from sec_client import SECClient
+
+# SEC's nightly bulk archives, downloaded beforehand from
+# https://www.sec.gov/Archives/edgar/daily-index/xbrl/companyfacts.zip and
+# https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip
+COMPANYFACTS_ZIP = "companyfacts.zip"
+SUBMISSIONS_ZIP = "submissions.zip"
+
+
+def iter_bulk_archive(zip_path: str, ciks: Iterable[str]) -> Iterator[Tuple[str, Dict]]:
+    """
+    Yields (10-digit CIK, parsed JSON) for the requested companies only.
+
+    Members are located through the ZIP central directory and decompressed
+    straight from the archive one at a time, so nothing is extracted to disk
+    and the other companies in the archive are never read.
+    """
+    with zipfile.ZipFile(zip_path) as archive:
+        members = set(archive.namelist())
+        for cik in dict.fromkeys(SECClient.format_cik(c) for c in ciks):
+            name = f"CIK{cik}.json"
+            if name not in members:
+                print(f"CIK {cik} not found in {zip_path}")
+                continue
+            with archive.open(name) as member:
+                yield cik, json.load(member)
+
+
+def read_bulk_companies(bulk_dir: str, ciks: Iterable[str]) -> Dict[str, Tuple[Dict, Dict]]:
+    """Facts and submissions for each CIK from companyfacts.zip / submissions.zip in ``bulk_dir``."""
+    ciks = [SECClient.format_cik(c) for c in ciks]
+    facts = dict(iter_bulk_archive(os.path.join(bulk_dir, COMPANYFACTS_ZIP), ciks))
+
+    info = {}
+    submissions_path = os.path.join(bulk_dir, SUBMISSIONS_ZIP)
+    if os.path.exists(submissions_path):
+        info = dict(iter_bulk_archive(submissions_path, ciks))
+    else:
+        print(f"{submissions_path} not found; latest 10-K dates will be empty")
+
+    return {cik: (facts.get(cik), info.get(cik)) for cik in ciks}
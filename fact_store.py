@@ -0,0 +1,106 @@
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+from pyarrow import fs
+
+from xbrl_normalizer import FACT_COLUMNS, apply_fact_dtypes, empty_facts_frame
+
+# Hive-partitioned Parquet dataset, one cik=... directory per company
+FACT_STORE_DIR = "sec_financial_data"
+# CIKs are zero-padded strings; without an explicit schema Arrow would infer integers
+PARTITIONING = ds.partitioning(pa.schema([("cik", pa.string())]), flavor="hive")
+
+
+def write_fact_store(facts: pd.DataFrame, tickers: Dict[str, str] = None, root: str = FACT_STORE_DIR):
+    """
+    Writes normalized facts (see xbrl_normalizer) partitioned by CIK. Only the
+    partitions of companies present in ``facts`` are replaced.
+
+    Rows are sorted by concept and period end so Parquet row-group statistics
+    can skip data when readers filter on them; categorical columns are stored
+    dictionary-encoded.
+    """
+    facts = facts.copy()
+    facts['ticker'] = facts['cik'].astype(str).map(tickers or {}).astype('category')
+    facts = facts.sort_values(['cik', 'concept', 'end'], kind='stable')
+
+    facts['cik'] = facts['cik'].astype(str)
+    table = pa.Table.from_pandas(facts, preserve_index=False)
+    ds.write_dataset(
+        table, root, format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+        max_rows_per_group=64 * 1024,
+    )
+
+
+def read_fact_store(root: str = FACT_STORE_DIR, columns: Optional[List[str]] = None,
+                    ciks: Optional[Iterable[str]] = None, tickers: Optional[Iterable[str]] = None,
+                    concepts: Optional[Iterable[str]] = None, start=None, end=None) -> pd.DataFrame:
+    """
+    Loads only the requested columns and the rows matching the filters. CIK
+    filters prune whole partitions; concept and period-end filters are pushed
+    down to Parquet row groups. Files are memory-mapped rather than read.
+    """
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING,
+                         filesystem=fs.LocalFileSystem(use_mmap=True))
+
+    conditions = []
+    if ciks is not None:
+        conditions.append(ds.field("cik").isin([str(int(c)).zfill(10) for c in ciks]))
+    if tickers is not None:
+        conditions.append(ds.field("ticker").isin(list(tickers)))
+    if concepts is not None:
+        conditions.append(ds.field("concept").isin(list(concepts)))
+    if start is not None:
+        conditions.append(ds.field("end") >= pd.Timestamp(start))
+    if end is not None:
+        conditions.append(ds.field("end") <= pd.Timestamp(end))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    frame = dataset.to_table(columns=columns, filter=expression).to_pandas()
+    if 'cik' in frame:
+        frame['cik'] = frame['cik'].astype('category')
+    return frame
+
+
+def facts_from_legacy_json(path: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """Reads the old pretty-printed sec_financial_data.json ({cik: {ticker, data: [...]}}) into normalized facts."""
+    with open(path, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+
+    frames = []
+    tickers = {}
+    for cik, company in legacy.items():
+        tickers[str(cik).zfill(10)] = company.get("ticker")
+        frame = pd.DataFrame.from_records(company.get("data", []))
+        if frame.empty:
+            continue
+        frame = frame.rename(columns={"end_date": "end", "start_date": "start", "filed_date": "filed"})
+        frame["cik"] = cik
+        frame["taxonomy"] = "us-gaap"
+        # Units in first-seen order per concept, matching the order the API lists them
+        first_seen = frame.drop_duplicates(["concept", "unit"])
+        frame["unit_order"] = frame.set_index(["concept", "unit"]).index.map(
+            pd.Series(first_seen.groupby("concept").cumcount().values,
+                      index=pd.MultiIndex.from_frame(first_seen[["concept", "unit"]])))
+        frames.append(frame)
+
+    if not frames:
+        return empty_facts_frame(), tickers
+    return apply_fact_dtypes(pd.concat(frames, ignore_index=True).reindex(columns=FACT_COLUMNS)), tickers
+
+
+if __name__ == "__main__":
+    # Migrate an existing JSON dump: python fact_store.py sec_financial_data.json
+    source = sys.argv[1] if len(sys.argv) > 1 else "sec_financial_data.json"
+    facts, tickers = facts_from_legacy_json(source)
+    write_fact_store(facts, tickers)
+    print(f"Wrote {len(facts)} facts for {len(tickers)} companies to {FACT_STORE_DIR}/")
@@ -0,0 +1,359 @@
+"""
+A local stand-in for the OpenAI Assistants API, for exercising the
+assistant code without an API key or a bill:
+
+    python fake_openai_server.py --port 8765 --rpm 120 --run-seconds 2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python openai/summarizer.py
+
+Runs complete ``--run-seconds`` after they're created and answer with a
+canned text, or a fenced JSON object for the summarizer's batched
+questions (``--drop-every`` blanks some fields to exercise the fallback).
+Runs created with stream=True answer with server-sent events instead.
+Files, vector stores and assistants are kept in memory for
+openai/assistant_handler.py's sync.
+Every response carries x-ratelimit-* headers for a sliding ``--rpm``
+request budget, and a request over it gets a 429 with
+retry-after-ms, like the real API. Prints request counts on exit.
+"""
+import argparse
+import collections
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ids = itertools.count(1)
+
+
+def new_id(prefix):
+    return f"{prefix}_{next(_ids):06d}"
+
+
+class FakeState:
+    def __init__(self, rpm, run_seconds, drop_every=0):
+        self.rpm = rpm
+        self.run_seconds = run_seconds
+        self.drop_every = drop_every
+        self.lock = threading.Lock()
+        self.request_times = collections.deque()
+        self.threads = {}  # thread id -> list of messages
+        self.runs = {}  # run id -> run dict
+        self.counts = collections.Counter()
+        self.active_runs = 0
+        self.max_active_runs = 0
+        self.assistants = {}  # assistant id -> assistant dict
+        self.files = {}  # file id -> file dict
+        self.vector_stores = {}  # vector store id -> set of file ids
+
+    def admit(self):
+        """Returns (allowed, headers) for one more request in the sliding 60 s window."""
+        with self.lock:
+            now = time.monotonic()
+            while self.request_times and now - self.request_times[0] > 60:
+                self.request_times.popleft()
+            reset = 60 - (now - self.request_times[0]) if self.request_times else 0.0
+            allowed = len(self.request_times) < self.rpm
+            if allowed:
+                self.request_times.append(now)
+            headers = {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-remaining-requests": str(self.rpm - len(self.request_times)),
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            }
+            if not allowed:
+                headers["retry-after-ms"] = str(int(reset * 1000) + 1)
+                self.counts["429"] += 1
+            return allowed, headers
+
+    def message(self, thread_id, role, text, run_id=None):
+        return {
+            "id": new_id("msg"), "object": "thread.message", "created_at": int(time.time()),
+            "thread_id": thread_id, "role": role, "run_id": run_id, "assistant_id": None,
+            "status": "completed", "attachments": [], "metadata": {},
+            "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        }
+
+    def answer(self, question):
+        if "Reply with only a JSON object" in question:
+            # A batched question: answer every key but leave every drop_every-th one blank
+            questions = json.loads(question[question.index("{"):])
+            answers = {key: "" if self.drop_every and i % self.drop_every == self.drop_every - 1
+                       else f"Fake answer to: {text}" for i, (key, text) in enumerate(questions.items())}
+            return "```json\n" + json.dumps(answers, indent=2) + "\n```"
+        return f"Fake answer to: {question}"
+
+    def start_run(self, thread_id, assistant_id):
+        run = {
+            "id": new_id("run"), "object": "thread.run", "created_at": int(time.time()),
+            "thread_id": thread_id, "assistant_id": assistant_id, "status": "queued",
+            "instructions": "", "model": "gpt-3.5-turbo", "tools": [], "parallel_tool_calls": True,
+            "last_error": None, "metadata": {}, "_done_at": time.monotonic() + self.run_seconds,
+        }
+        with self.lock:
+            self.runs[run["id"]] = run
+            self.active_runs += 1
+            self.max_active_runs = max(self.max_active_runs, self.active_runs)
+        return run
+
+    def reply(self, run):
+        """The assistant message answering the last message of the run's thread (not yet posted)."""
+        question = self.threads[run["thread_id"]][-1]["content"][0]["text"]["value"]
+        return self.message(run["thread_id"], "assistant", self.answer(question), run["id"])
+
+    def complete(self, run, message):
+        self.threads[run["thread_id"]].append(message)
+        run["status"] = "completed"
+        self.active_runs -= 1
+
+    def refresh(self, run):
+        """Completes the run once its time is up, posting the assistant's answer."""
+        with self.lock:
+            if run["status"] in ("queued", "in_progress"):
+                if time.monotonic() >= run["_done_at"]:
+                    self.complete(run, self.reply(run))
+                else:
+                    run["status"] = "in_progress"
+        return self.public(run)
+
+    @staticmethod
+    def public(run):
+        return {k: v for k, v in run.items() if not k.startswith("_")}
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    state: FakeState = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Type", "").startswith("multipart/form-data"):
+            # A file upload: only the name and size matter here
+            filename = re.search(rb'filename="([^"]*)"', data)
+            return {"filename": filename.group(1).decode() if filename else "upload", "bytes": len(data)}
+        return json.loads(data) if data else {}
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _event(self, event, data):
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream(self, run, headers):
+        """
+        Answers a run created with stream=True with server-sent events like
+        the real API: run created, the reply in word-sized deltas spread over
+        the second half of --run-seconds, message completed, run completed.
+        """
+        state = self.state
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+
+        self._event("thread.run.created", state.public(run))
+        run["status"] = "in_progress"
+        self._event("thread.run.in_progress", state.public(run))
+        time.sleep(state.run_seconds / 2)
+
+        message = state.reply(run)
+        text = message["content"][0]["text"]["value"]
+        self._event("thread.message.created", dict(message, status="in_progress", content=[]))
+        chunks = re.findall(r"\S*\s*", text)[:-1] or [text]
+        for chunk in chunks:
+            if run["status"] == "cancelled":
+                return
+            try:
+                self._event("thread.message.delta", {"id": message["id"], "object": "thread.message.delta", "delta": {
+                    "content": [{"index": 0, "type": "text", "text": {"value": chunk, "annotations": []}}]}})
+            except (BrokenPipeError, ConnectionResetError):
+                state.counts["streams closed by client"] += 1
+                return
+            time.sleep(state.run_seconds / 2 / len(chunks))
+        self._event("thread.message.completed", message)
+        with state.lock:
+            state.complete(run, message)
+        self._event("thread.run.completed", state.public(run))
+        self.wfile.write(b"event: done\ndata: [DONE]\n\n")
+
+    def _dispatch(self, method):
+        state = self.state
+        path = self.path.split("?")[0]
+        body = self._body() if method == "POST" else {}
+        allowed, headers = state.admit()
+        if not allowed:
+            error = {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}
+            return self._send(429, {"error": error}, headers)
+        route = re.sub(r"/(thread|run|msg)_[0-9]+", lambda m: "/{" + m.group(1) + "}", path)
+        state.counts[f"{method} {route}"] += 1
+
+        if method == "POST" and path == "/v1/threads/runs":
+            thread_id = new_id("thread")
+            state.threads[thread_id] = [state.message(thread_id, m["role"], m["content"])
+                                        for m in body.get("thread", {}).get("messages", [])]
+            run = state.start_run(thread_id, body["assistant_id"])
+            return self._stream(run, headers) if body.get("stream") else self._send(200, state.refresh(run), headers)
+        if method == "POST" and path == "/v1/threads":
+            thread_id = new_id("thread")
+            state.threads[thread_id] = [state.message(thread_id, m["role"], m["content"])
+                                        for m in body.get("messages", [])]
+            return self._send(200, {"id": thread_id, "object": "thread", "created_at": int(time.time()),
+                                    "metadata": {}}, headers)
+
+        if path.startswith("/v1/assistants") or path.startswith("/v1/files") or path.startswith("/v1/vector_stores"):
+            return self._data_route(method, path, body, headers)
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/messages", path)
+        if match and match.group(1) in state.threads:
+            thread_id = match.group(1)
+            if method == "POST":
+                message = state.message(thread_id, body["role"], body["content"])
+                state.threads[thread_id].append(message)
+                return self._send(200, message, headers)
+            run_id = re.search(r"run_id=([^&]+)", self.path)
+            messages = [m for m in reversed(state.threads[thread_id])
+                        if not run_id or m["run_id"] == run_id.group(1)]
+            return self._send(200, {"object": "list", "data": messages, "has_more": False,
+                                    "first_id": None, "last_id": None}, headers)
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs(?:/([^/]+))?", path)
+        if match and match.group(1) in state.threads:
+            if method == "POST" and not match.group(2):
+                run = state.start_run(match.group(1), body["assistant_id"])
+                return self._stream(run, headers) if body.get("stream") else self._send(200, state.refresh(run), headers)
+            if method == "GET" and match.group(2) in state.runs:
+                return self._send(200, state.refresh(state.runs[match.group(2)]), headers)
+
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs/([^/]+)/cancel", path)
+        if match and method == "POST" and match.group(2) in state.runs:
+            run = state.runs[match.group(2)]
+            with state.lock:
+                if run["status"] in ("queued", "in_progress"):
+                    run["status"] = "cancelled"
+                    state.active_runs -= 1
+            return self._send(200, state.public(run), headers)
+
+        self._send(404, {"error": {"message": f"Unknown route {method} {path}", "type": "invalid_request_error"}})
+
+    def _data_route(self, method, path, body, headers):
+        """Assistants, files and vector stores: enough of them for assistant_handler's sync."""
+        state = self.state
+        now = int(time.time())
+
+        if (path == "/v1/assistants" and method == "POST") or re.fullmatch(r"/v1/assistants/[^/]+", path):
+            assistant_id = path.rsplit("/", 1)[1] if path != "/v1/assistants" else new_id("asst")
+            assistant = state.assistants.get(assistant_id, {
+                "id": assistant_id, "object": "assistant", "created_at": now, "name": None,
+                "description": None, "instructions": "", "model": "gpt-3.5-turbo", "tools": [],
+                "metadata": {}, "tool_resources": {"file_search": {"vector_store_ids": ["vs_fake"]}},
+            })
+            if method == "POST":
+                assistant.update({k: v for k, v in body.items() if k in assistant})
+                state.assistants[assistant_id] = assistant
+            return self._send(200, assistant, headers)
+
+        if path == "/v1/files" and method == "POST":
+            file = {"id": new_id("file"), "object": "file", "bytes": body["bytes"], "created_at": now,
+                    "filename": body["filename"], "purpose": "assistants", "status": "processed"}
+            state.files[file["id"]] = file
+            return self._send(200, file, headers)
+        match = re.fullmatch(r"/v1/files/([^/]+)", path)
+        if match and method == "DELETE" and state.files.pop(match.group(1), None):
+            return self._send(200, {"id": match.group(1), "object": "file", "deleted": True}, headers)
+
+        def store(store_id):
+            counts = {"cancelled": 0, "completed": len(state.vector_stores[store_id]), "failed": 0,
+                      "in_progress": 0, "total": len(state.vector_stores[store_id])}
+            return {"id": store_id, "object": "vector_store", "created_at": now, "name": "", "metadata": {},
+                    "status": "completed", "usage_bytes": 0, "last_active_at": now, "file_counts": counts}
+
+        def store_file(store_id, file_id):
+            return {"id": file_id, "object": "vector_store.file", "created_at": now, "last_error": None,
+                    "status": "completed", "usage_bytes": 0, "vector_store_id": store_id}
+
+        if path == "/v1/vector_stores" and method == "POST":
+            store_id = new_id("vs")
+            state.vector_stores[store_id] = set(body.get("file_ids") or [])
+            return self._send(200, store(store_id), headers)
+        match = re.fullmatch(r"/v1/vector_stores/([^/]+)(/files|/file_batches)?(?:/([^/]+))?", path)
+        if match and match.group(1) in state.vector_stores:
+            store_id, collection, item = match.groups()
+            files = state.vector_stores[store_id]
+            if collection is None and method == "GET":
+                return self._send(200, store(store_id), headers)
+            if collection == "/files" and method == "GET" and item is None:
+                data = [store_file(store_id, file_id) for file_id in sorted(files)]
+                return self._send(200, {"object": "list", "data": data, "has_more": False,
+                                        "first_id": None, "last_id": None}, headers)
+            if collection == "/files" and method == "DELETE" and item in files:
+                files.discard(item)
+                return self._send(200, {"id": item, "object": "vector_store.file.deleted", "deleted": True},
+                                  headers)
+            if collection == "/file_batches":
+                if method == "POST":
+                    files.update(body["file_ids"])
+                    state.counts["embedded files"] += len(body["file_ids"])
+                counts = {"cancelled": 0, "completed": len(files), "failed": 0, "in_progress": 0, "total": len(files)}
+                return self._send(200, {"id": item or new_id("vsfb"), "object": "vector_store.files_batch",
+                                        "created_at": now, "status": "completed", "file_counts": counts,
+                                        "vector_store_id": store_id}, headers)
+
+        self._send(404, {"error": {"message": f"Unknown route {method} {path}", "type": "invalid_request_error"}},
+                   headers)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+
+def serve(port=8765, rpm=120, run_seconds=2.0, drop_every=0):
+    """Starts the server on a background thread; returns (server, state)."""
+    state = FakeState(rpm, run_seconds, drop_every)
+    handler = type("Handler", (FakeOpenAIHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI Assistants API on localhost.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=120, help="request budget per minute")
+    parser.add_argument("--run-seconds", type=float, default=2.0, help="how long each run takes")
+    parser.add_argument("--drop-every", type=int, default=0,
+                        help="leave every Nth field of batched JSON answers blank (0: none)")
+    args = parser.parse_args()
+
+    server, state = serve(args.port, args.rpm, args.run_seconds, args.drop_every)
+    print(f"Fake OpenAI API on http://127.0.0.1:{args.port}/v1 (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+    print(f"Requests: {dict(state.counts)}; most runs in flight: {state.max_active_runs}")
+
+
+if __name__ == "__main__":
+    main()
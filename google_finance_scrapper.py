@@ -1,15 +1,12 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 
-# Set up the Selenium WebDriver
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")  # Run in headless mode (remove for debugging)
-driver = webdriver.Chrome(options=options)
+from browser_pool import get_pool
 
-try:
+# Borrow a headless Chrome from the shared pool (BROWSER_HEADLESS=0 to watch it)
+with get_pool().borrow() as driver:
     # Open the Google Finance page
     url = "https://www.google.com/finance/quote/MLNK:NYSE?hl=en"
     driver.get(url)
@@ -44,6 +41,3 @@ try:
     # Scrape Balance Sheet and Cash Flow tabs
     scrape_tab("Balance Sheet")
     scrape_tab("Cash Flow")
-
-finally:
-    driver.quit()
@@ -0,0 +1,73 @@
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlite_cache import SQLiteCache, Validators, compress
+
+HTTP_CACHE_FILE = ".http_cache.sqlite"
+DEFAULT_TTL = 24 * 60 * 60  # Serve without revalidating for a day
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # Compressed bodies; least recently used entries go first
+
+
+@dataclass
+class CachedResponse(Validators):
+    url: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class HTTPCache(SQLiteCache):
+    """Disk-backed response cache keyed by URL, with zlib-compressed bodies and LRU eviction."""
+    TABLE = "responses"
+    KEY = ("url",)
+
+    def __init__(self, path: str = HTTP_CACHE_FILE, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(path, """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+        """, ttl, max_bytes)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body, etag, last_modified, stored_at = row
+        return CachedResponse(url, zlib.decompress(body), etag, last_modified, stored_at)
+
+    def put(self, url: str, body: bytes, etag: str = None, last_modified: str = None):
+        compressed = compress(body)
+        now = time.time()
+        with self._lock:
+            replaced = self._size_of((url,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, len(compressed), etag, last_modified, now, now),
+            )
+            self._total += len(compressed) - (replaced or 0)
+            self._evict()
+            self._conn.commit()
+
+    def revalidated(self, url: str):
+        """Marks an entry as fresh again after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                               (now, now, url))
+            self._conn.commit()
@@ -1,29 +1,18 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
-from selenium_stealth import stealth
 
-options = webdriver.ChromeOptions()
-driver = webdriver.Chrome(options=options)
+from browser_pool import get_pool
+from page_ready import wait_for_page
 
-stealth(driver,
-    languages=["en-US", "en"],
-    vendor="Google Inc.",
-    platform="Win32",
-    webgl_vendor="Intel Inc.",
-    renderer="Intel Iris OpenGL Engine",
-    fix_hairline=True,
-)
 def scrape_investing(search_terms):
-    driver = webdriver.Chrome()  # Ensure you have chromedriver installed
-    wait = WebDriverWait(driver, 10)
+    # selenium-stealth drivers come from their own pool, never handed to other scrapers
+    with get_pool(stealth=True).borrow() as driver:
+        wait = WebDriverWait(driver, 10)
 
-    try:
         driver.get("https://www.investing.com/")
-        time.sleep(2)  # Allow page to load
+        wait_for_page(driver, "investing.home", until=EC.presence_of_element_located((By.CSS_SELECTOR, "input[name='q']")))
 
         for term in search_terms:
             # Locate the search box and enter search term
@@ -43,7 +32,7 @@ def scrape_investing(search_terms):
 
             for url in article_urls:
                 driver.get(url)
-                time.sleep(2)
+                wait_for_page(driver, "investing.article")
 
                 # Extract article content
                 article_text = wait.until(EC.presence_of_element_located((By.TAG_NAME, "body"))).text
@@ -51,14 +40,11 @@ def scrape_investing(search_terms):
 
                 # Go back to the search results page
                 driver.back()
-                time.sleep(2)
+                wait_for_page(driver, "investing.back", until=EC.presence_of_element_located((By.CLASS_NAME, "searchSectionMain")))
 
             # Save scraped data to a text file
             with open(f"{term.replace(' ', '_')}_articles.txt", "w", encoding="utf-8") as file:
                 file.writelines(scraped_data)
 
-    finally:
-        driver.quit()
-
 # Run the function with a list of search terms
 scrape_investing(["MeridianLink Inc"])
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+FSYNC_EVERY = 20  # Records
+FSYNC_INTERVAL = 2.0  # Seconds
+
+# Streams written by the scrapers -> the legacy JSON file each one used to write and how to shape it
+LEGACY_FILES = {
+    "stock_data.jsonl": ("stock_data.json", {}),
+    "yahoo_results_1.jsonl": ("yahoo_results_1.json", {"group_by": "ticker", "indent": 2, "ensure_ascii": False}),
+    "scraped_data.jsonl": ("scraped_data.json", {}),
+    "competitors.jsonl": ("competitors.json", {"group_by": "company", "value": "competitors", "ensure_ascii": False}),
+    "competitors/competitors_data.jsonl": ("competitors/competitors_data.json", {}),
+}
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """Records in file order; a torn last line from a crash mid-write is ignored."""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                return
+            yield json.loads(line)
+
+
+class JsonlSink:
+    """
+    Appends records to a newline-delimited JSON file as a scraper produces
+    them, so a crash loses at most the last unsynced batch instead of the run.
+
+    Records are flushed to the OS on every write and fsynced every
+    ``fsync_every`` records or ``fsync_interval`` seconds. ``key_fields`` name
+    the fields identifying a record: keys already in the file are loaded on
+    open, ``write`` skips records whose key was written before, and scrapers
+    use ``has``/``count`` to skip work a previous run finished.
+
+    Only an interrupted run is resumed: ``mark_complete`` leaves a marker
+    next to the file, and the next sink opened on it starts a fresh stream.
+    """
+
+    def __init__(self, path: str, key_fields: Sequence[str], fsync_every: int = FSYNC_EVERY,
+                 fsync_interval: float = FSYNC_INTERVAL):
+        self.path = path
+        self.key_fields = tuple(key_fields)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.keys = set()
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        if os.path.exists(self.complete_marker):
+            # The last run finished; this is a new run, not a resume
+            os.remove(self.complete_marker)
+            open(path, "w").close()
+
+        valid_bytes = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self.keys.add(self.key(json.loads(line)))
+                    valid_bytes += len(line)
+            if valid_bytes < os.path.getsize(path):
+                # Drop a torn last line so the next record starts on a line of its own
+                with open(path, "r+b") as f:
+                    f.truncate(valid_bytes)
+            if self.keys:
+                print(f"Resuming {path}: {len(self.keys)} records already written")
+        self._file = open(path, "a", encoding="utf-8")
+
+    @property
+    def complete_marker(self) -> str:
+        return self.path + ".complete"
+
+    def key(self, record: Dict) -> Tuple:
+        return tuple(record.get(field) for field in self.key_fields)
+
+    def has(self, *key) -> bool:
+        with self._lock:
+            return tuple(key) in self.keys
+
+    def count(self, *prefix) -> int:
+        """Written records whose key starts with ``prefix``."""
+        # Under the lock: other threads add keys in write()
+        with self._lock:
+            return sum(1 for key in self.keys if key[:len(prefix)] == prefix)
+
+    def write(self, record: Dict) -> bool:
+        """Appends ``record`` unless its key was already written; returns whether it was."""
+        key = self.key(record)
+        with self._lock:
+            if key in self.keys:
+                return False
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.keys.add(key)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+        return True
+
+    def write_all(self, records: Iterable[Dict]) -> int:
+        return sum(self.write(record) for record in records)
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+
+    def mark_complete(self):
+        """
+        Closes the sink and records that the run finished, so the next one
+        starts over. Call it only after the stream's outputs (e.g. the legacy
+        JSON file) are written: a crash before then must leave it resumable.
+        """
+        self.close()
+        open(self.complete_marker, "w").close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def compact(jsonl_path: str, json_path: str, group_by: Optional[str] = None, value: Optional[str] = None,
+            indent: int = 4, ensure_ascii: bool = True, group_order: Optional[Sequence[str]] = None,
+            order: Optional[Callable[[Dict], Any]] = None):
+    """
+    Rebuilds a legacy JSON file from a JSONL stream: a list of records, or
+    with ``group_by`` a dict of group -> records without that field (or
+    group -> ``record[value]``). ``group_order`` lists the groups in the
+    order the file should have them, each with an empty list if it has no
+    records; groups not in it follow in stream order. ``order`` sorts a
+    list of records (stably, so in memory) when a resumed stream wrote them
+    out of order. Written atomically so readers never see a partial file.
+    """
+    tmp_path = json_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if group_by is None:
+            records = read_jsonl(jsonl_path)
+            if order is not None:
+                records = sorted(records, key=order)
+            # Streamed element by element, byte-identical to json.dump(records, f, indent=indent)
+            f.write("[")
+            written = 0
+            for record in records:
+                element = json.dumps(record, indent=indent, ensure_ascii=ensure_ascii)
+                f.write(("," if written else "") + "\n" + " " * indent + element.replace("\n", "\n" + " " * indent))
+                written += 1
+            f.write("\n]" if written else "]")
+        else:
+            groups = {group: [] for group in group_order or ()} if value is None else {}
+            for record in read_jsonl(jsonl_path):
+                group = record[group_by]
+                if value is not None:
+                    groups[group] = record[value]
+                else:
+                    groups.setdefault(group, []).append({k: v for k, v in record.items() if k != group_by})
+            json.dump(groups, f, indent=indent, ensure_ascii=ensure_ascii)
+    os.replace(tmp_path, json_path)
+
+
+def compact_legacy(jsonl_path: str, group_order: Optional[Sequence[str]] = None,
+                   order: Optional[Callable[[Dict], Any]] = None):
+    """Rebuilds the legacy JSON file LEGACY_FILES maps ``jsonl_path`` to (see compact for ``group_order``, ``order``)."""
+    json_path, options = LEGACY_FILES[jsonl_path]
+    compact(jsonl_path, json_path, group_order=group_order, order=order, **options)
+    print(f"Compacted {jsonl_path} into {json_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild legacy JSON outputs from the scrapers' JSONL streams.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact_parser = subparsers.add_parser("compact", help="rebuild JSON files (every known stream by default)")
+    compact_parser.add_argument("jsonl", nargs="?", help="a JSONL stream")
+    compact_parser.add_argument("json", nargs="?", help="output file for a stream not in LEGACY_FILES")
+    compact_parser.add_argument("--group-by")
+    compact_parser.add_argument("--value")
+    compact_parser.add_argument("--indent", type=int, default=4)
+    compact_parser.add_argument("--no-ascii", action="store_true", help="write non-ASCII characters as is")
+    args = parser.parse_args()
+
+    if args.jsonl is None:
+        for jsonl_path in LEGACY_FILES:
+            if os.path.exists(jsonl_path):
+                compact_legacy(jsonl_path)
+    elif args.json is None:
+        compact_legacy(args.jsonl)
+    else:
+        compact(args.jsonl, args.json, args.group_by, args.value, args.indent, not args.no_ascii)
+        print(f"Compacted {args.jsonl} into {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
+import json
 import openai
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from answer_cache import AnswerCache, file_sha256
+from checkpoint import atomic_write
+
 # Load .env file
 load_dotenv()
 
@@ -10,6 +15,9 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # File to store assistant ID
 ASSISTANT_ID_FILE = "assistant_id.txt"
+# Local record of the vector store and the uploaded file behind each local file
+MANIFEST_FILE = "vector_store_manifest.json"
+UPLOAD_WORKERS = 4
 
 # Assistant prompt
 prompt = """
@@ -20,10 +28,11 @@ Ensure responses are well-organized, concise, and actionable.
 def upload_file(file_path):
     """Uploads a file to OpenAI and returns the file ID."""
     try:
-        response = openai.files.create(
-            file=open(file_path, "rb"),
-            purpose="assistants"
-        )
+        with open(file_path, "rb") as f:
+            response = openai.files.create(
+                file=f,
+                purpose="assistants"
+            )
         print('Uploaded File Response:', response)
         return response.id
     except Exception as e:
@@ -43,6 +52,91 @@ def create_vector_store(file_ids):
         print(f"Error creating vector store: {e}")
         return None
 
+def read_manifest():
+    """The last sync's {"vector_store_id": ..., "files": {path: {"sha256": ..., "file_id": ...}}}."""
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"vector_store_id": None, "files": {}}
+
+def write_manifest(manifest):
+    atomic_write(MANIFEST_FILE, json.dumps(manifest, indent=2))
+
+def vector_store_file_ids(vector_store_id):
+    """IDs of the files attached to a vector store, or None if the store doesn't exist anymore."""
+    try:
+        return {file.id for file in openai.beta.vector_stores.files.list(vector_store_id=vector_store_id, limit=100)}
+    except openai.NotFoundError:
+        return None
+
+def remove_file(vector_store_id, file_id):
+    """Detaches a superseded file from the vector store and deletes it."""
+    try:
+        if vector_store_id:
+            openai.beta.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
+        openai.files.delete(file_id)
+        print(f"Removed old file {file_id}")
+    except openai.NotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error removing file {file_id}: {e}")
+
+def sync_vector_store(files):
+    """
+    Brings the vector store in line with the local ``files``, uploading only
+    the ones whose content changed since the last sync (concurrently) and
+    attaching them to the existing store in place of their old versions.
+    The store is only created when there's none yet or it was deleted
+    remotely. Returns (vector_store_id, {path: sha256} of what the store
+    now holds); vector_store_id is None if the store couldn't be created.
+    """
+    manifest = read_manifest()
+    known = manifest.get("files", {})
+    hashes = {}
+    for file in files:
+        if os.path.exists(file):
+            hashes[file] = file_sha256(file)
+        else:
+            print(f"Skipping missing file {file}")
+
+    vector_store_id = manifest.get("vector_store_id")
+    attached = vector_store_file_ids(vector_store_id) if vector_store_id else None
+    if attached is None:
+        # First sync, or the store is gone: everything goes into a new one
+        for entry in known.values():
+            remove_file(None, entry["file_id"])
+        known = {}
+        attached = set()
+        vector_store_id = create_vector_store([])
+        if not vector_store_id:
+            return None, {}
+
+    changed = [file for file, digest in hashes.items()
+               if file not in known or known[file]["sha256"] != digest or known[file]["file_id"] not in attached]
+    print(f"{len(hashes) - len(changed)} files unchanged, uploading {len(changed)}")
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        uploaded = dict(zip(changed, executor.map(upload_file, changed)))
+
+    new_file_ids = [file_id for file_id in uploaded.values() if file_id is not None]
+    if new_file_ids:
+        # One batch attaches every new file; waits until they're embedded
+        batch = openai.beta.vector_stores.file_batches.create_and_poll(
+            vector_store_id=vector_store_id, file_ids=new_file_ids
+        )
+        print(f"Vector store batch {batch.status}: {batch.file_counts}")
+
+    for file, file_id in uploaded.items():
+        if file_id is None:
+            continue  # Keeps the old version (if any); the next sync retries the upload
+        if file in known:
+            remove_file(vector_store_id, known[file]["file_id"])
+        known[file] = {"sha256": hashes[file], "file_id": file_id}
+    for file in [file for file in known if file not in files]:
+        remove_file(vector_store_id, known.pop(file)["file_id"])
+
+    write_manifest({"vector_store_id": vector_store_id, "files": known})
+    return vector_store_id, {file: entry["sha256"] for file, entry in known.items()}
+
 def create_assistant(vector_store_id):
     """Creates a new OpenAI assistant with the given vector store."""
     try:
@@ -88,21 +182,17 @@ def write_assistant_id(assistant_id):
 if __name__ == "__main__":
     # List of files to upload
     files = ["./company_summary.json", "./stock_data.json", "./yahoo_results.json"]
-    
-    # Upload files and get file IDs
-    # this did DOUBLE uploads:  file_ids = [upload_file(file) for file in files if upload_file(file) is not None]
-    file_ids = [id for file in files if (id := upload_file(file)) is not None]
 
-    if not file_ids:
-        print("No files were uploaded. Exiting...")
-        exit(1)
+    # Upload only new or changed files into the existing vector store
+    previous_vector_store_id = read_manifest().get("vector_store_id")
+    vector_store_id, file_hashes = sync_vector_store(files)
 
-    # Create a vector store using the uploaded file IDs
-    vector_store_id = create_vector_store(file_ids)
-    
     if not vector_store_id:
         print("Failed to create vector store. Exiting...")
         exit(1)
+    if not file_hashes:
+        print("No files were uploaded. Exiting...")
+        exit(1)
 
     print("Vector Store ID:", vector_store_id)
 
@@ -110,15 +200,26 @@ if __name__ == "__main__":
     assistant_id = read_assistant_id()
 
     if assistant_id:
-        updated_assistant_id = update_assistant(assistant_id, vector_store_id)
-        if updated_assistant_id:
-            print(f"Updated Assistant ID: {updated_assistant_id}")
+        if vector_store_id == previous_vector_store_id:
+            print(f"Assistant {assistant_id} already uses this vector store")
         else:
-            print("Failed to update assistant.")
+            updated_assistant_id = update_assistant(assistant_id, vector_store_id)
+            if updated_assistant_id:
+                print(f"Updated Assistant ID: {updated_assistant_id}")
+            else:
+                print("Failed to update assistant.")
     else:
         new_assistant_id = create_assistant(vector_store_id)
         if new_assistant_id:
             write_assistant_id(new_assistant_id)
             print(f"Created New Assistant ID: {new_assistant_id}")
+            assistant_id = new_assistant_id
         else:
             print("Failed to create a new assistant.")
+
+    # Answers the summarizer cached against the old data are stale if any file changed
+    cache = AnswerCache()
+    if cache.record_sources(vector_store_id, {os.path.basename(file): digest for file, digest in file_hashes.items()}):
+        dropped = cache.invalidate(assistant_id) if assistant_id else 0
+        print(f"Data changed: dropped {dropped} cached answers")
+    cache.close()
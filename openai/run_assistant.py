@@ -1,5 +1,7 @@
+import httpx
 import openai
 from dotenv import load_dotenv
+import math
 import os
 import time
 
@@ -9,6 +11,8 @@ openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # Fetch assistant ID from .env or manually set it
 ASSISTANT_ID = os.getenv("ASSISTANT_ID")  # Ensure this is set in your .env file
+RUN_TIMEOUT = 120  # Seconds to wait for the next streamed event before giving up
+TIMINGS = []  # Per question: time to first token and total seconds
 
 def create_thread():
     """Creates a new thread for conversation."""
@@ -24,46 +28,77 @@ def send_message(thread_id, user_message):
     )
 
 def run_assistant(thread_id):
-    """Runs the assistant on the given thread and waits for completion."""
-    run = openai.beta.threads.runs.create(
-        thread_id=thread_id,
-        assistant_id=ASSISTANT_ID
-    )
-
+    """
+    Runs the assistant on the given thread, printing its reply as the
+    tokens stream in. Returns the reply, time to first token and total
+    seconds (or None for the reply if the run didn't complete).
+    """
+    started = time.monotonic()
+    first_token = None
     print("\nAssistant is thinking...", end="", flush=True)
 
-    # Wait for the assistant to complete processing
-    while True:
-        run_status = openai.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
-        if run_status.status == "completed":
-            print("\r", end="")  # Clear the "thinking" message
-            break
-        print(".", end="", flush=True)  # Show dots while waiting
-        time.sleep(2)  # Wait before checking again
+    with openai.beta.threads.runs.stream(
+        thread_id=thread_id, assistant_id=ASSISTANT_ID, timeout=RUN_TIMEOUT
+    ) as stream:
+        for text in stream.text_deltas:
+            if first_token is None:
+                first_token = time.monotonic() - started
+                print("\rAssistant: " + " " * 16 + "\rAssistant: ", end="")  # Replace the "thinking" message
+            print(text, end="", flush=True)
+        run = stream.get_final_run()
+        messages = stream.get_final_messages()
+    total = time.monotonic() - started
+    print()
 
-def get_response(thread_id):
-    """Retrieves the latest assistant response from the thread."""
-    messages = openai.beta.threads.messages.list(thread_id=thread_id)
-    # print('messages:',messages)
-    for message in messages.data:  # Reverse to get the latest messages first
-        if message.role == "assistant":
-            text_response = message.content[0].text.value.strip()  # Extract and clean response
-            return text_response if text_response else "I don't have an answer for that."
+    if run.status != "completed":
+        print(f"Run {run.status}: {run.last_error}")
+        return None, first_token, total
+    reply = messages[-1].content[0].text.value.strip() if messages else ""
+    return reply, first_token, total
 
-    return "I didn't get a response. Please try again."
+def percentile(values, p):
+    """Nearest-rank percentile of ``values``, or None if there are none."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+def print_timing_summary():
+    """p50/p95 time to first token and total time over the session's questions."""
+    if not TIMINGS:
+        return
+    print(f"\nLatency over {len(TIMINGS)} questions:")
+    for label, key in [("first token", "first_token"), ("total", "total")]:
+        values = [t[key] for t in TIMINGS if t[key] is not None]
+        if values:
+            print(f"  {label}: p50 {percentile(values, 50):.1f}s, p95 {percentile(values, 95):.1f}s")
 
 if __name__ == "__main__":
     thread_id = create_thread()  # Create a new conversation thread
     print(f"Thread ID: {thread_id}")
 
-    while True:
-        user_input = input("\nYou: ")
-        if user_input.lower() in ["exit", "quit"]:
-            print("Exiting chat...")
-            break
-        
-        send_message(thread_id, user_input)  # Send user input
-        run_assistant(thread_id)  # Process input
-        response = get_response(thread_id)  # Get response
+    try:
+        while True:
+            user_input = input("\nYou: ")
+            if user_input.lower() in ["exit", "quit"]:
+                print("Exiting chat...")
+                break
+
+            send_message(thread_id, user_input)  # Send user input
+            try:
+                response, first_token, total = run_assistant(thread_id)  # Stream the reply
+            except (openai.APIError, httpx.HTTPError) as e:  # Incl. a stream that stalled past RUN_TIMEOUT
+                print(f"\nRequest failed: {e}")
+                continue
 
-        print(f"Assistant: {response}")
+            TIMINGS.append({"question": user_input, "first_token": first_token, "total": total})
+            if response == "":
+                print("I don't have an answer for that.")
+            if first_token is not None:
+                print(f"[first token {first_token:.1f}s, total {total:.1f}s]")
+            else:
+                print(f"[total {total:.1f}s]")
+    except (EOFError, KeyboardInterrupt):
+        print("\nExiting chat...")
+    finally:
+        print_timing_summary()
@@ -1,24 +1,22 @@
+import asyncio
 import csv
+import json
 import re
 import os
-import time
-import random
 import pandas as pd
-from openai import OpenAI
 from openpyxl.styles import PatternFill
 
+from checkpoint import Checkpoint
+from assistant_runner import AssistantRunner
+from answer_cache import AnswerCache
+
 from dotenv import load_dotenv
 load_dotenv()
 
 # Constants
 ASSISTANT_ID_FILE = "assistant_id.txt"
-RATE_LIMIT_DELAY = 10  # Start with 10 seconds (exponential backoff increases this)
-MAX_RETRIES = 5  # Maximum retries per request
-CHECK_INTERVAL = 5  # Time in seconds to check API status
-TIMEOUT = 300  # Max wait time (5 minutes)
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Ask all of a company's columns in one run returning JSON; SUMMARIZER_BATCH=0 asks every question in its own run
+BATCH_MODE = os.getenv("SUMMARIZER_BATCH", "1") != "0"
 
 def read_companies(filename):
     """Reads companies and their tickers from a CSV file."""
@@ -86,65 +84,81 @@ def generate_questions():
         "OTHER TAXONOMIES": "What other relevant industry classifications apply to {company}?"
     }
 
-def query_assistant(assistant_id, question):
-    """Queries OpenAI Assistant with rate limit handling and retries."""
-    attempt = 0
-    while attempt < MAX_RETRIES:
-        try:
-            time.sleep(random.uniform(2, 5))  # Random delay to avoid hitting rate limits
-            
-            print("Creating a new thread...")
-            thread = client.beta.threads.create()
-            print(f"Thread ID: {thread.id}")
-
-            # Add the question
-            print("Sending question to the assistant...")
-            client.beta.threads.messages.create(
-                thread_id=thread.id, role="user", content=question
-            )
-
-            # Run the assistant
-            print("Running assistant...")
-            run = client.beta.threads.runs.create(
-                thread_id=thread.id, assistant_id=assistant_id
-            )
-
-            # Wait for completion with timeout
-            start_time = time.time()
-            while True:
-                time.sleep(CHECK_INTERVAL)
-                run = client.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
-                print(f"Checking status: {run.status}")
-
-                if run.status == "completed":
-                    break  # Exit loop if done
-
-                if run.status == "failed":
-                    print(f"Run failed: {run}")
-                    return "ERROR: Run failed"
-
-                if time.time() - start_time > TIMEOUT:
-                    print("Timeout reached! Skipping this request...")
-                    return "ERROR: Timeout"
-
-            # Retrieve response
-            print("Retrieving response...")
-            messages = client.beta.threads.messages.list(thread_id=thread.id)
-            if not messages.data:
-                print("No messages found in thread!")
-                return "ERROR: No response received"
-
-            answer = messages.data[0].content[0].text.value
-            print(f"Received answer: {answer[:50]}...")  # Print only the first 50 chars
-            return answer
-
-        except Exception as e:
-            print(f"Attempt {attempt + 1} failed: {e}")
-            attempt += 1
-            time.sleep(RATE_LIMIT_DELAY * (2 ** attempt))  # Exponential backoff
-
-    print(f"Skipping question due to repeated failures: {question}")
-    return "ERROR: API failed"
+def batch_question(company, questions):
+    """One prompt asking all of ``questions`` (column -> question) at once, answered as a JSON object."""
+    return (
+        f"Answer each of the following questions about {company}. Reply with only a JSON object that has "
+        "exactly these keys, each mapped to your answer to its question as a string:\n"
+        + json.dumps(questions, indent=2, ensure_ascii=False)
+    )
+
+def parse_batch_answer(answer, keys):
+    """The usable fields of a batched answer: ``keys`` present with a non-empty text (or number) value."""
+    start, end = answer.find("{"), answer.rfind("}")  # Tolerates code fences and text around the object
+    if start == -1 or end < start:
+        return {}
+    try:
+        fields = json.loads(answer[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(fields, dict):
+        return {}
+
+    valid = {}
+    for key in keys:
+        value = fields.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if isinstance(value, str) and value.strip() and not value.startswith("ERROR:"):
+            valid[key] = value.strip()
+    return valid
+
+async def answer_questions(assistant_id, pending, checkpoint, batch=BATCH_MODE):
+    """
+    Answers every company's pending questions concurrently; the runner's
+    adaptive limit decides how many runs are in flight. ``pending`` is a
+    list of (company, {unit: (column, question)}). With ``batch``, each
+    company gets one run for all its columns and only fields missing from
+    (or invalid in) the JSON answer are asked one by one. Returns {unit: answer}.
+    """
+    # Answers to the same question against the same assistant and data are reused across runs
+    runner = AssistantRunner(assistant_id, cache=AnswerCache())
+
+    async def ask_one(unit, question):
+        print(f"Asking: {question}")
+        result = await runner.ask(question)
+        if not result.startswith("ERROR:"):  # Failed questions are asked again on the next run
+            checkpoint.save(unit, result)
+        return unit, result
+
+    async def ask_company(company, units):
+        answers = {}
+        if batch and len(units) > 1:
+            print(f"Asking {len(units)} questions about {company} in one run")
+            questions = {key: question for key, question in units.values()}
+            fields = parse_batch_answer(await runner.ask(batch_question(company, questions)), questions)
+            answers = {unit: fields[key] for unit, (key, _) in units.items() if key in fields}
+            if answers:
+                checkpoint.save_many(answers)
+            if len(answers) < len(units):
+                print(f"{company}: {len(units) - len(answers)} fields missing or invalid, asking them one by one")
+
+        answers.update(await asyncio.gather(*(ask_one(unit, question)
+                                              for unit, (_, question) in units.items() if unit not in answers)))
+        print(f"Finished processing {company}")
+        return answers
+
+    answers = {}
+    for company_answers in await asyncio.gather(*(ask_company(company, units) for company, units in pending)):
+        answers.update(company_answers)
+    print(f"Finished {len(answers)} questions ({runner.cache_hits} answered from the cache), "
+          f"final concurrency {int(runner.limiter.limit)}")
+    summary = runner.timing_summary()
+    if summary["count"]:
+        print(f"Latency over {summary['count']} runs: first token mean {summary['first_token_mean'] or 0:.1f}s "
+              f"(max {summary['first_token_max'] or 0:.1f}s), total mean {summary['total_mean']:.1f}s "
+              f"(max {summary['total_max']:.1f}s)")
+    return answers
 
 def write_to_excel(data, output_file):
     """Writes the collected data to an Excel file."""
@@ -161,8 +175,10 @@ def write_to_excel(data, output_file):
                 cell.fill = header_fill
 
         print(f"Successfully wrote data to {output_file}")
+        return True
     except Exception as e:
         print(f"Error writing to Excel: {e}")
+        return False
 
 def main():
     companies, tickers = read_companies("companies.csv")
@@ -176,24 +192,31 @@ def main():
         return
 
     questions = generate_questions()
-    data = []
+    # Every answer is saved as soon as it arrives, so an interrupted run doesn't pay for it twice
+    checkpoint = Checkpoint("summarizer", run_id=assistant_id)
 
+    pending = []
     for company, ticker in zip(companies, tickers):
-        print(f"Processing company: {company} ({ticker})")
-        company_data = {"COMPANY": company, "TICKER": ticker}
-
+        units = {}
         for key, question_template in questions.items():
-            question = question_template.format(company=company)
-            print(f"Asking: {question}")
-            answer = query_assistant(assistant_id, question)
-            company_data[key] = answer
+            unit = f"{company} ({ticker})/{key}"
+            if unit not in checkpoint:
+                units[unit] = (key, question_template.format(company=company))
+        if units:
+            pending.append((company, units))
 
-        data.append(company_data)
-        print(f"Finished processing {company}")
+    answers = asyncio.run(answer_questions(assistant_id, pending, checkpoint)) if pending else {}
 
-        time.sleep(random.uniform(5, 10))  # Add a delay to prevent hitting rate limits
+    data = []
+    for company, ticker in zip(companies, tickers):
+        company_data = {"COMPANY": company, "TICKER": ticker}
+        for key in questions:
+            unit = f"{company} ({ticker})/{key}"
+            company_data[key] = answers.get(unit, checkpoint.get(unit))
+        data.append(company_data)
 
-    write_to_excel(data, "market_research.xlsx")
+    if write_to_excel(data, "market_research.xlsx"):
+        checkpoint.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,136 @@
+import re
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+from bs4 import BeautifulSoup
+
+from browser_pool import USER_AGENT
+from page_store import get_page_store
+
+STATIC_TIMEOUT = 15
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def http_client() -> httpx.Client:
+    """A process-wide pooled keep-alive client; httpx.Client is safe to share between threads."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+                follow_redirects=True, timeout=STATIC_TIMEOUT,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+            )
+        return _client
+
+
+def paragraph_text(html: str) -> str:
+    """Joins the text of every non-empty <p>, like the Selenium scrapers do."""
+    return _paragraph_text(BeautifulSoup(html, "lxml"))
+
+
+def _paragraph_text(soup: BeautifulSoup) -> str:
+    texts = (p.get_text(" ", strip=True) for p in soup.find_all("p"))
+    return " ".join(text for text in texts if text)
+
+
+def iso_date(value: Optional[str]) -> Optional[str]:
+    """The YYYY-MM-DD a datetime attribute starts with, or None."""
+    match = ISO_DATE.match((value or "").strip())
+    return match.group(0) if match else None
+
+
+def published_date(soup: BeautifulSoup) -> Optional[str]:
+    """The date of the first <time datetime>, the same element dom_extract reads in the browser."""
+    time = soup.find("time", datetime=True)
+    return iso_date(time["datetime"]) if time else None
+
+
+def fetch_static(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+    """GETs a page over the pooled client; None if the request failed. A 304 is returned as is."""
+    try:
+        response = http_client().get(url, headers=headers)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+    except httpx.HTTPError as e:
+        print(f"Static fetch failed for {url}: {e}")
+        return None
+
+
+def is_html_type(content_type: Optional[str]) -> bool:
+    return "html" in (content_type or "text/html")
+
+
+def is_html(response: httpx.Response) -> bool:
+    return is_html_type(response.headers.get("content-type"))
+
+
+def extract_text(url: str, browser_fallback: Callable[[str], str],
+                 clean: Callable[[str], str] = lambda text: text, min_length: int = 200) -> str:
+    """
+    Cleaned page text via a plain HTTP GET, falling back to ``browser_fallback(url)``
+    only when the static text is missing or not longer than ``min_length``.
+    See extract_dated_text.
+    """
+    return extract_dated_text(url, lambda url: (None, browser_fallback(url)), clean, min_length)[1]
+
+
+def extract_dated_text(url: str, browser_fallback: Callable[[str], Tuple[Optional[str], str]],
+                       clean: Callable[[str], str] = lambda text: text,
+                       min_length: int = 200) -> Tuple[Optional[str], str]:
+    """
+    (date, text) of a page: the cleaned text via a plain HTTP GET, falling
+    back to ``browser_fallback(url)``, which returns (date, text) too, only
+    when the static text is missing or not longer than ``min_length``. The
+    date is the page's first <time datetime> as YYYY-MM-DD, None if it has
+    none.
+
+    Non-HTML responses (e.g. PDFs) return (None, "") straight away: a
+    browser wouldn't find any <p> in them either.
+
+    Results are kept in the shared page store: a fresh entry is returned
+    without touching the network, and a stale static one is revalidated with
+    a conditional GET. Non-HTML responses are stored too (their type and
+    validators, without the body), so they aren't downloaded again every run.
+    """
+    store = get_page_store()
+    stored = store.get(url)
+    if stored is not None and stored.is_fresh(store.ttl) and (
+            len(stored.text) > min_length or stored.source == "browser" or not is_html_type(stored.content_type)):
+        return stored.meta.get("date"), stored.text
+
+    revalidate = stored is not None and stored.source == "static" and stored.raw_text is not None
+    response = fetch_static(url, stored.conditional_headers() if revalidate else None)
+    if response is not None and response.status_code == 304:
+        store.revalidated(url)
+        if not is_html_type(stored.content_type):
+            return None, ""
+        text = clean(stored.raw_text)
+        if len(text) > min_length:
+            return stored.meta.get("date"), text
+    elif response is not None:
+        if not is_html(response):
+            store.put(url, "", raw_text="", status=response.status_code,
+                      content_type=response.headers.get("content-type"), etag=response.headers.get("etag"),
+                      last_modified=response.headers.get("last-modified"))
+            return None, ""
+        soup = BeautifulSoup(response.text, "lxml")
+        raw_text = _paragraph_text(soup)
+        date = published_date(soup)
+        text = clean(raw_text)
+        if text:
+            store.put(url, text, raw_text=raw_text, body=response.content, status=response.status_code,
+                      content_type=response.headers.get("content-type"), etag=response.headers.get("etag"),
+                      last_modified=response.headers.get("last-modified"), meta={"date": date} if date else None)
+        if len(text) > min_length:
+            return date, text
+
+    date, text = browser_fallback(url)
+    if text:
+        store.put(url, text, source="browser", meta={"date": date} if date else None)
+    return date, text
@@ -0,0 +1,161 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+# Hard upper bound on any single wait
+READY_TIMEOUT = float(os.getenv("PAGE_READY_TIMEOUT", "15"))
+# The network counts as idle once no more than NETWORK_IDLE_INFLIGHT requests
+# have been in flight for NETWORK_IDLE_TIME seconds (long-polling and analytics
+# beacons never finish, so waiting for zero would always time out)
+NETWORK_IDLE_TIME = float(os.getenv("NETWORK_IDLE_TIME", "0.5"))
+NETWORK_IDLE_INFLIGHT = 2
+# Requests older than this are assumed to be streams or leftovers of the previous page
+STALE_REQUEST_AGE = 10
+POLL_INTERVAL = 0.1
+
+WAIT_TIMINGS: List[Dict] = []
+_timings_lock = threading.Lock()
+
+
+class NetworkTracker:
+    """
+    Follows in-flight requests from Chrome's performance log (CDP Network.*
+    events that chromedriver buffers when ``goog:loggingPrefs`` enables it;
+    see browser_pool.chrome_options). Falls back to "always idle" on drivers
+    without the log, so readiness then rests on document.readyState alone.
+    """
+
+    def __init__(self):
+        self.inflight: Dict[str, float] = {}
+        self.last_activity = time.time()
+        self.available = True
+
+    def poll(self, driver):
+        if not self.available:
+            return
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            self.available = False
+            return
+
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message.get("method", ""), message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                self.inflight[params["requestId"]] = entry["timestamp"] / 1000
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                self.inflight.pop(params.get("requestId"), None)
+            else:
+                continue
+            self.last_activity = max(self.last_activity, entry["timestamp"] / 1000)
+
+    def idle(self, now: float) -> bool:
+        if not self.available:
+            return True
+        active = sum(1 for started in self.inflight.values() if now - started < STALE_REQUEST_AGE)
+        return active <= NETWORK_IDLE_INFLIGHT and now - self.last_activity >= NETWORK_IDLE_TIME
+
+
+def _document_complete(driver) -> bool:
+    try:
+        return driver.execute_script("return document.readyState") == "complete"
+    except Exception:
+        return False
+
+
+def wait_for_page(driver, label: str, until: Optional[Callable] = None,
+                  timeout: float = READY_TIMEOUT) -> str:
+    """
+    Blocks until the current page is usable and returns why the wait ended:
+
+    - "ready":   ``until(driver)`` returned something truthy (an element
+                 predicate such as an expected_conditions instance);
+    - "idle":    document.readyState is "complete" and the network has gone
+                 quiet, so nothing more is coming;
+    - "timeout": neither happened within ``timeout`` seconds.
+
+    Every wait is recorded under ``label`` in WAIT_TIMINGS.
+    """
+    started = time.monotonic()
+    tracker = NetworkTracker()
+    outcome = "timeout"
+
+    while time.monotonic() - started < timeout:
+        if until is not None:
+            try:
+                if until(driver):
+                    outcome = "ready"
+                    break
+            except Exception:
+                pass
+        tracker.poll(driver)
+        if _document_complete(driver) and tracker.idle(time.time()):
+            outcome = "idle"
+            break
+        time.sleep(POLL_INTERVAL)
+
+    record_wait(label, time.monotonic() - started, outcome)
+    return outcome
+
+
+class Pacer:
+    """
+    Spaces out requests to a site that rate-limits bots (Google search).
+    Unlike a fixed sleep before every request, time already spent loading
+    and parsing pages counts towards the interval.
+    """
+
+    def __init__(self, label: str, interval: Callable[[], float]):
+        self.label = label
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.interval()
+        if delay:
+            time.sleep(delay)
+        record_wait(self.label, delay, "paced")
+
+
+def record_wait(label: str, seconds: float, outcome: str):
+    with _timings_lock:
+        WAIT_TIMINGS.append({"label": label, "seconds": seconds, "outcome": outcome})
+
+
+def wait_summary() -> Dict[str, Dict]:
+    """Per-label count, total/mean/max seconds and timeouts."""
+    with _timings_lock:
+        timings = list(WAIT_TIMINGS)
+    by_label = defaultdict(list)
+    for timing in timings:
+        by_label[timing["label"]].append(timing)
+    return {
+        label: {
+            "count": len(waits),
+            "total": sum(w["seconds"] for w in waits),
+            "mean": sum(w["seconds"] for w in waits) / len(waits),
+            "max": max(w["seconds"] for w in waits),
+            "timeouts": sum(w["outcome"] == "timeout" for w in waits),
+        }
+        for label, waits in by_label.items()
+    }
+
+
+@atexit.register
+def print_wait_summary():
+    summary = wait_summary()
+    if not summary:
+        return
+    print("\nPage waits (seconds):")
+    for label, stats in sorted(summary.items(), key=lambda item: -item[1]["total"]):
+        print(f"  {label:<40} n={stats['count']:<5} total={stats['total']:8.1f} "
+              f"mean={stats['mean']:6.2f} max={stats['max']:6.2f} timeouts={stats['timeouts']}")
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlite_cache import SQLiteCache, Validators, compress, pack_text, unpack_text
+
+PAGE_STORE_FILE = os.getenv("PAGE_STORE_FILE", ".page_store.sqlite")
+PAGE_STORE_TTL = float(os.getenv("PAGE_STORE_TTL", str(7 * 24 * 60 * 60)))  # Articles rarely change after a week
+PAGE_STORE_MAX_BYTES = int(os.getenv("PAGE_STORE_MAX_BYTES", str(1024 * 1024 * 1024)))  # Compressed; LRU goes first
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid", "guccounter", "guce_referrer", "guce_referrer_sig",
+                   "ncid", "soc_src", "soc_trk", "cmpid", "ref"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    The store key for a URL: scheme and host lowercased, default ports,
+    fragments and tracking parameters dropped, remaining parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not (scheme, parts.port) in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS)
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+@dataclass
+class StoredPage(Validators):
+    url: str
+    view: str
+    text: str
+    raw_text: Optional[str]
+    source: str
+    status: Optional[int]
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    body_hash: Optional[str]
+    meta: Dict = field(default_factory=dict)
+
+    @property
+    def stored_at(self) -> float:
+        return self.fetched_at
+
+
+class PageStore(SQLiteCache):
+    """
+    Scraped pages shared by every scraper and kept across runs.
+
+    Entries are keyed by (normalized URL, view), where the view names what was
+    extracted ("text" for paragraph text, "article" for Yahoo articles, ...),
+    and hold the cleaned and raw text, HTTP validators and a reference to the
+    zlib-compressed response body. Bodies are stored once per SHA-256 of
+    their content, however many URLs served them. Least recently used
+    entries are evicted over ``max_bytes`` (see SQLiteCache), and entries
+    expired for more than a TTL are dropped.
+    """
+    TABLE = "pages"
+    KEY = ("url_key", "view")
+
+    def __init__(self, path: str = PAGE_STORE_FILE, ttl: float = PAGE_STORE_TTL,
+                 max_bytes: int = PAGE_STORE_MAX_BYTES):
+        super().__init__(path, """
+            CREATE TABLE IF NOT EXISTS bodies (
+                hash TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                url_key TEXT NOT NULL,
+                view TEXT NOT NULL,
+                url TEXT NOT NULL,
+                text BLOB NOT NULL,
+                raw_text BLOB,
+                source TEXT NOT NULL,
+                status INTEGER,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                body_hash TEXT REFERENCES bodies (hash),
+                meta TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (url_key, view)
+            );
+            CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+            CREATE INDEX IF NOT EXISTS pages_fetched ON pages (fetched_at);
+            CREATE INDEX IF NOT EXISTS pages_body ON pages (body_hash);
+        """, ttl, max_bytes)
+        with self._lock:
+            self._expire(time.time())
+            self._total = self._total_bytes()
+            self._conn.commit()
+
+    def get(self, url: str, view: str = "text") -> Optional[StoredPage]:
+        """The stored entry, fresh or not (see StoredPage.is_fresh), or None."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, text, raw_text, source, status, content_type, etag, last_modified, fetched_at, "
+                "body_hash, meta FROM pages WHERE url_key = ? AND view = ?", (key, view)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url_key = ? AND view = ?",
+                               (time.time(), key, view))
+            self._conn.commit()
+        (stored_url, text, raw_text, source, status, content_type, etag, last_modified, fetched_at,
+         body_hash, meta) = row
+        return StoredPage(stored_url, view, unpack_text(text), unpack_text(raw_text), source, status, content_type,
+                          etag, last_modified, fetched_at, body_hash, json.loads(meta) if meta else {})
+
+    def get_fresh(self, url: str, view: str = "text") -> Optional[StoredPage]:
+        page = self.get(url, view)
+        return page if page is not None and page.is_fresh(self.ttl) else None
+
+    def body(self, page: StoredPage) -> Optional[bytes]:
+        if page.body_hash is None:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM bodies WHERE hash = ?", (page.body_hash,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def put(self, url: str, text: str, view: str = "text", source: str = "static", raw_text: str = None,
+            body: bytes = None, status: int = None, content_type: str = None, etag: str = None,
+            last_modified: str = None, meta: Dict = None):
+        packed_text, packed_raw = pack_text(text), pack_text(raw_text)
+        size = len(packed_text) + len(packed_raw or b"")
+        body_hash = hashlib.sha256(body).hexdigest() if body is not None else None
+        compressed = compress(body) if body is not None else None
+        now = time.time()
+        key = normalize_url(url)
+        with self._lock:
+            if body_hash is not None:
+                if self._conn.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?, ?)",
+                                      (body_hash, compressed, len(compressed))).rowcount:
+                    self._total += len(compressed)
+            replaced = self._conn.execute("SELECT size, body_hash FROM pages WHERE url_key = ? AND view = ?",
+                                          (key, view)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, view, url, packed_text, packed_raw, source, status, content_type, etag,
+                 last_modified, body_hash, json.dumps(meta) if meta else None, size, now, now),
+            )
+            self._total += size
+            if replaced is not None:
+                self._total -= replaced[0]
+                if replaced[1] not in (None, body_hash):
+                    self._delete_body_if_orphan(replaced[1])
+            self._evict()
+            self._conn.commit()
+
+    def revalidated(self, url: str, view: str = "text"):
+        """Marks an entry as fresh again after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url_key = ? AND view = ?",
+                               (now, now, normalize_url(url), view))
+            self._conn.commit()
+
+    def _total_bytes(self) -> int:
+        bodies = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        return super()._total_bytes() + bodies
+
+    def _expire(self, now: float):
+        """Drops entries expired for more than a TTL, and the bodies only they referenced."""
+        if self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (now - 2 * self.ttl,)).rowcount:
+            self._conn.execute("DELETE FROM bodies WHERE hash NOT IN "
+                               "(SELECT body_hash FROM pages WHERE body_hash IS NOT NULL)")
+
+    def _remove(self, key: Tuple, size: int):
+        row = self._conn.execute("SELECT body_hash FROM pages WHERE url_key = ? AND view = ?", key).fetchone()
+        super()._remove(key, size)
+        if row is not None and row[0] is not None:
+            self._delete_body_if_orphan(row[0])
+
+    def _delete_body_if_orphan(self, body_hash: str):
+        if self._conn.execute("SELECT 1 FROM pages WHERE body_hash = ? LIMIT 1", (body_hash,)).fetchone() is None:
+            row = self._conn.execute("SELECT size FROM bodies WHERE hash = ?", (body_hash,)).fetchone()
+            if row is not None:
+                self._total -= row[0]
+                self._conn.execute("DELETE FROM bodies WHERE hash = ?", (body_hash,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_page_store() -> PageStore:
+    """The process-wide store; SQLite in WAL mode also lets several scraper processes share the file."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PageStore()
+        return _store
@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fact_store import read_fact_store, FACT_STORE_DIR
+
+
+def _ns(date) -> int:
+    return int(np.datetime64(pd.Timestamp(date) if date is not None else 'NaT', 'ns').view('int64'))
+
+
+INDEX_COLUMNS = ['cik', 'concept', 'end', 'start', 'filed', 'value', 'accn', 'form', 'unit', 'unit_order']
+
+
+class AmbiguousPeriod(LookupError):
+    """Several durations of a concept end on the queried date and no period start was given."""
+
+
+class PointInTimeIndex:
+    """
+    Restatement-aware lookup over normalized SEC facts.
+
+    Every (cik, concept, period_end, period_start) key keeps all of its reported
+    versions sorted by filing date, so "the value as known on date D" is a
+    binary search over that key's versions instead of a rescan of every fact.
+    ``period_start`` only matters for duration concepts, where a quarter and a
+    year-to-date figure can share the same period end; without it, a lookup
+    matches the one fact ending on ``period_end`` and raises AmbiguousPeriod
+    if there are several.
+    """
+
+    def __init__(self, facts: pd.DataFrame, first_unit_only: bool = True):
+        if first_unit_only:
+            facts = facts[facts['unit_order'] == 0]
+        facts = facts.reindex(columns=INDEX_COLUMNS).sort_values(
+            ['cik', 'concept', 'end', 'start', 'filed'], kind='stable', na_position='first')
+
+        self.cik = facts['cik'].astype(str).to_numpy()
+        self.concept = facts['concept'].astype(str).to_numpy()
+        self.end = facts['end'].to_numpy(dtype='datetime64[ns]')
+        self.start = facts['start'].to_numpy(dtype='datetime64[ns]')
+        self.filed = facts['filed'].to_numpy(dtype='datetime64[ns]')
+        self.value = facts['value'].to_numpy(dtype='float64')
+        self.accn = facts['accn'].astype(str).to_numpy()
+        self.form = facts['form'].astype(str).to_numpy()
+        self.unit = facts['unit'].astype(str).to_numpy()
+
+        # Key -> [lo, hi) slice of the filing-date-sorted arrays above
+        self._slices: Dict[Tuple, Tuple[int, int]] = {}
+        # (cik, concept, end) -> every period start (NaT for instants) reported for it
+        self._starts: Dict[Tuple, List[int]] = {}
+        if len(facts):
+            end_ns, start_ns = self.end.view('int64'), self.start.view('int64')
+            changed = np.ones(len(facts), dtype=bool)
+            changed[1:] = ((self.cik[1:] != self.cik[:-1]) | (self.concept[1:] != self.concept[:-1])
+                           | (end_ns[1:] != end_ns[:-1]) | (start_ns[1:] != start_ns[:-1]))
+            bounds = np.append(np.flatnonzero(changed), len(facts))
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
+                key = (self.cik[lo], self.concept[lo], int(end_ns[lo]), int(start_ns[lo]))
+                self._slices[key] = (int(lo), int(hi))
+                self._starts.setdefault(key[:3], []).append(key[3])
+
+    @classmethod
+    def from_store(cls, root: str = FACT_STORE_DIR, ciks: Optional[Iterable[str]] = None,
+                   concepts: Optional[Iterable[str]] = None) -> 'PointInTimeIndex':
+        """Builds the index from the Parquet fact store, loading only the columns it needs."""
+        return cls(read_fact_store(root, columns=INDEX_COLUMNS, ciks=ciks, concepts=concepts))
+
+    def _slice(self, cik: str, concept: str, period_end, period_start=None) -> Optional[Tuple[int, int]]:
+        # Dates are keyed by their int64 nanoseconds, since NaT never compares equal to itself
+        key = (str(int(cik)).zfill(10), concept, _ns(period_end))
+        if period_start is not None:
+            return self._slices.get(key + (_ns(period_start),))
+        starts = self._starts.get(key, [])
+        if len(starts) > 1:
+            known = ", ".join("none" if start == _ns(None) else str(pd.Timestamp(start).date()) for start in starts)
+            raise AmbiguousPeriod(f"{concept} has {len(starts)} periods ending {pd.Timestamp(period_end).date()} "
+                                  f"for CIK {cik} (starts: {known}); pass period_start")
+        return self._slices[key + (starts[0],)] if starts else None
+
+    def version_as_of(self, cik: str, concept: str, period_end, as_of,
+                      period_start=None) -> Optional[Dict]:
+        """
+        The latest version of a fact filed on or before ``as_of``, or None if
+        none was filed yet. Raises AmbiguousPeriod if ``period_start`` is
+        needed to tell several durations ending on ``period_end`` apart.
+        """
+        bounds = self._slice(cik, concept, period_end, period_start)
+        if bounds is None:
+            return None
+        lo, hi = bounds
+        pos = lo + np.searchsorted(self.filed[lo:hi], np.datetime64(pd.Timestamp(as_of), 'ns'), side='right') - 1
+        if pos < lo:
+            return None
+        return {
+            'value': float(self.value[pos]),
+            'unit': self.unit[pos],
+            'filed': pd.Timestamp(self.filed[pos]),
+            'form': self.form[pos],
+            'accn': self.accn[pos],
+        }
+
+    def value_as_of(self, cik: str, concept: str, period_end, as_of, period_start=None) -> Optional[float]:
+        version = self.version_as_of(cik, concept, period_end, as_of, period_start)
+        return version['value'] if version else None
+
+    def history(self, cik: str, concept: str, period_end, period_start=None) -> pd.DataFrame:
+        """Every reported version of one fact, oldest filing first."""
+        bounds = self._slice(cik, concept, period_end, period_start)
+        lo, hi = bounds if bounds else (0, 0)
+        return pd.DataFrame({
+            'filed': self.filed[lo:hi], 'value': self.value[lo:hi], 'form': self.form[lo:hi],
+            'accn': self.accn[lo:hi], 'unit': self.unit[lo:hi],
+        })
+
+    def snapshot(self, as_of, concepts: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """What was known on ``as_of`` for every company and period at once: one row per key."""
+        known = self.filed <= np.datetime64(pd.Timestamp(as_of), 'ns')
+        if concepts is not None:
+            known &= np.isin(self.concept, list(concepts))
+        frame = pd.DataFrame({
+            'cik': self.cik[known], 'concept': self.concept[known], 'end': self.end[known],
+            'start': self.start[known], 'filed': self.filed[known], 'value': self.value[known],
+            'form': self.form[known], 'accn': self.accn[known], 'unit': self.unit[known],
+        })
+        # Arrays are filing-date sorted within each key, so the last row per key is the latest known
+        return frame.groupby(['cik', 'concept', 'end', 'start'], dropna=False, sort=False).tail(1).reset_index(drop=True)
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from http_cache import HTTPCache, HTTP_CACHE_FILE, DEFAULT_TTL
+
+# SEC asks automated clients to stay at or below 10 requests per second
+SEC_MAX_REQUESTS_PER_SECOND = 10
+# Overridable so the client can be pointed at a local stub server
+SEC_BASE_URL = os.getenv("SEC_BASE_URL", "https://data.sec.gov")
+MAX_RETRIES = 3
+# How long cached companyfacts/submissions JSON is served without asking SEC again
+SEC_CACHE_TTL = float(os.getenv("SEC_CACHE_TTL", DEFAULT_TTL))
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every SEC request in the process.
+
+    Callers reserve a token and then sleep for however long the bucket says,
+    so the bucket works the same from any thread or event loop. A capacity of
+    one spaces requests exactly 1/rate seconds apart.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Takes a token and returns how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def acquire_sync(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+
+# One limiter for the whole process, so concurrent stages share SEC's budget
+SEC_RATE_LIMITER = TokenBucket(SEC_MAX_REQUESTS_PER_SECOND)
+
+
+class SECClient:
+    """Async EDGAR JSON client over one pooled keep-alive HTTP/1.1 connection pool.
+
+    Responses are kept in an on-disk HTTPCache: entries younger than the TTL
+    are served without a request, older ones are revalidated with
+    If-None-Match / If-Modified-Since. Pass ``cache_path=None`` to disable it.
+    The cache is opened on ``async with`` and closed on exit, like the HTTP
+    client, so the client can be entered again afterwards.
+    """
+
+    def __init__(self, user_agent: str, base_url: str = SEC_BASE_URL,
+                 rate_limiter: TokenBucket = SEC_RATE_LIMITER, max_connections: int = 10,
+                 timeout: float = 30.0, cache_path: Optional[str] = HTTP_CACHE_FILE):
+        self.base_url = base_url.rstrip("/")
+        self.rate_limiter = rate_limiter
+        self.cache_path = cache_path
+        self.cache = None
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+        }
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_connections)
+        self.timeout = timeout
+        self._client = None
+
+    async def __aenter__(self):
+        self.cache = HTTPCache(self.cache_path, ttl=SEC_CACHE_TTL) if self.cache_path else None
+        self._client = httpx.AsyncClient(headers=self.headers, limits=self.limits,
+                                         timeout=self.timeout, http2=False)
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            await self._client.aclose()
+        finally:
+            self._client = None
+            if self.cache:
+                self.cache.close()
+                self.cache = None
+
+    @staticmethod
+    def format_cik(cik: str) -> str:
+        """Format CIK to 10 digits with leading zeros"""
+        return str(int(cik)).zfill(10)
+
+    async def get_json(self, path: str) -> Optional[Dict]:
+        """GETs a JSON document, retrying rate-limit and server errors. Returns None on failure.
+
+        ``path`` is relative to the client's base URL unless it is already an
+        absolute URL (e.g. the ticker map on www.sec.gov).
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.is_fresh(self.cache.ttl):
+            print(f"Using cached {url}")
+            return json.loads(cached.body)
+
+        for attempt in range(MAX_RETRIES + 1):
+            await self.rate_limiter.acquire()
+            try:
+                print(f"Requesting URL: {url}")
+                response = await self._client.get(url, headers=cached.conditional_headers() if cached else None)
+                if response.status_code == 304 and cached:
+                    self.cache.revalidated(url)
+                    return json.loads(cached.body)
+                if response.status_code in (429, 500, 502, 503, 504) and attempt < MAX_RETRIES:
+                    retry_after = response.headers.get("Retry-After", "")
+                    await asyncio.sleep(float(retry_after) if retry_after.isdigit() else 2 ** attempt)
+                    continue
+                response.raise_for_status()
+                data = response.json()
+                if self.cache:
+                    self.cache.put(url, response.content, response.headers.get("ETag"),
+                                   response.headers.get("Last-Modified"))
+                return data
+            except (httpx.HTTPError, ValueError) as e:
+                if attempt < MAX_RETRIES and isinstance(e, httpx.TransportError):
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                print(f"Error fetching {url}: {e}")
+                return None
+        return None
+
+    async def get_company_facts(self, cik: str) -> Optional[Dict]:
+        """Get company facts including financial data"""
+        return await self.get_json(f"/api/xbrl/companyfacts/CIK{self.format_cik(cik)}.json")
+
+    async def get_company_info(self, cik: str) -> Optional[Dict]:
+        """Get company submission information"""
+        return await self.get_json(f"/submissions/CIK{self.format_cik(cik)}.json")
+
+    async def get_many(self, ciks: Iterable[str], fetch) -> Dict[str, Optional[Dict]]:
+        """Runs ``fetch`` (e.g. ``self.get_company_facts``) for every CIK concurrently."""
+        ciks = list(dict.fromkeys(ciks))
+        results = await asyncio.gather(*(fetch(cik) for cik in ciks))
+        return dict(zip(ciks, results))
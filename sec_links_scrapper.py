@@ -1,120 +1,210 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+import argparse
+import asyncio
 import csv
+import io
+import json
+import os
 import re
+import time
+from typing import Dict, List
+
+from sec_client import SECClient, SEC_BASE_URL
+from checkpoint import Checkpoint, atomic_write
+
+USER_AGENT = 'Your Company Name (your.email@domain.com)'
+# company_tickers.json lives on www.sec.gov rather than data.sec.gov; a stub server (SEC_BASE_URL) serves both
+TICKERS_URL = SEC_BASE_URL.rstrip("/").replace("://data.", "://www.", 1) + "/files/company_tickers.json"
+TICKERS_FILE = "company_tickers.json"
+LINKS_FILE = "10k_links.csv"
+TICKERS_MAX_AGE = 7 * 24 * 60 * 60  # Refresh the local ticker -> CIK map weekly
+
+# Everything EDGAR lists under "10-K & 10-Q" in the filing search UI
+PERIODIC_FORMS = {
+    "10-K", "10-K/A", "10-KT", "10-KT/A", "10-Q", "10-Q/A", "10-QT", "10-QT/A",
+    "NT 10-K", "NT 10-K/A", "NT 10-Q", "NT 10-Q/A",
+}
+
+def read_tickers(filename="companies.csv"):
+    """Reads the tickers out of entries like "Company Inc. (TICK)"."""
+    tickers = []
+    with open(filename, mode="r", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        for row in reader:
+            for entry in row:
+                match = re.match(r"(.+?)\s\((\w+)\)", entry.strip())
+                if match:
+                    tickers.append(match.group(2))
+    return tickers
+
+async def load_ticker_ciks(client: SECClient) -> Dict[str, str]:
+    """Maps ticker -> CIK using SEC's company_tickers.json, cached next to the script."""
+    data = None
+    if os.path.exists(TICKERS_FILE) and time.time() - os.path.getmtime(TICKERS_FILE) < TICKERS_MAX_AGE:
+        with open(TICKERS_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if data is None:
+        data = await client.get_json(TICKERS_URL)
+        if data is None:
+            return {}
+        with open(TICKERS_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    return {entry["ticker"].upper(): str(entry["cik_str"]) for entry in data.values()}
+
+def filing_links(cik: str, filings: Dict) -> List[str]:
+    """Builds document URLs for the periodic reports in a submissions ``filings`` column block."""
+    cik_padded = SECClient.format_cik(cik)
+    links = []
+    inline = filings.get("isInlineXBRL", [])
+    for idx, form in enumerate(filings.get("form", [])):
+        if form not in PERIODIC_FORMS or not filings["primaryDocument"][idx]:
+            continue
+        accession = filings["accessionNumber"][idx].replace("-", "")
+        path = f"/Archives/edgar/data/{cik_padded}/{accession}/{filings['primaryDocument'][idx]}"
+        # Inline XBRL filings open in the iXBRL viewer, like the search UI links
+        if idx < len(inline) and inline[idx]:
+            links.append(f"https://www.sec.gov/ix?doc={path}")
+        else:
+            links.append(f"https://www.sec.gov{path}")
+    return links
+
+async def resolve_10k_links(tickers: List[str]) -> Dict[str, List[str]]:
+    """
+    Resolves 10-K/10-Q document links for every ticker straight from the
+    EDGAR submissions JSON, without a browser. Tickers that cannot be mapped
+    to a CIK are left out of the result.
+    """
+    results = {}
+    async with SECClient(USER_AGENT) as client:
+        ticker_ciks = await load_ticker_ciks(client)
+
+        async def resolve(ticker):
+            cik = ticker_ciks.get(ticker.upper())
+            if not cik:
+                print(f"No CIK found for {ticker}")
+                return
+            submissions = await client.get_company_info(cik)
+            if not submissions:
+                return
+            links = filing_links(cik, submissions["filings"]["recent"])
+            # Filings beyond the most recent 1000 are paged into extra files
+            for extra in submissions["filings"].get("files", []):
+                older = await client.get_json(f"/submissions/{extra['name']}")
+                if older:
+                    links += filing_links(cik, older)
+            print(f"Found {len(links)} 10-K reports for {ticker}")
+            results[ticker] = links
+
+        await asyncio.gather(*(resolve(ticker) for ticker in tickers))
+    return results
 
 def get_all_10k_links(ticker):
     """
     Scrapes all 10-K report links for a given stock ticker from SEC.gov.
     Returns a list of URLs.
+
+    Drives the EDGAR search UI in headless Chrome; only used as a fallback
+    for tickers resolve_10k_links cannot map (see --selenium-fallback).
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from browser_pool import get_pool
+    from page_ready import wait_for_page
+
     sec_url = "https://www.sec.gov/search-filings"
     
-    # Set up Selenium WebDriver with enhanced headless configuration
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless=new")  # Modern headless mode
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")  # Set a standard resolution
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")  # Avoid detection
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option("useAutomationExtension", False)
-    
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    
-    try:
-        # Set a custom User-Agent
-        driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-            "userAgent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-        })
-        
-        driver.get(sec_url)
-        wait = WebDriverWait(driver, 15)  # Increased wait time
+    # Borrow a pooled Chrome (shared options and User-Agent) instead of starting one per ticker
+    with get_pool().borrow() as driver:
+        try:
+            driver.get(sec_url)
+            wait = WebDriverWait(driver, 15)  # Increased wait time
 
-        # Add a small initial delay to ensure page loads completely
-        time.sleep(3)
+            wait_for_page(driver, "sec_links.search_page", until=EC.presence_of_element_located((By.ID, "edgar-company-person")))
 
-        # Locate search box and enter ticker
-        search_box = wait.until(EC.presence_of_element_located((By.ID, "edgar-company-person")))
-        search_box.clear()
-        search_box.send_keys(ticker)
-        time.sleep(2)
+            # Locate search box and enter ticker
+            search_box = wait.until(EC.presence_of_element_located((By.ID, "edgar-company-person")))
+            search_box.clear()
+            search_box.send_keys(ticker)
 
-        # Wait for and interact with dropdown
-        dropdown_table = wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "smart-search-entity-hints")))
+            # Wait for and interact with dropdown
+            dropdown_table = wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "smart-search-entity-hints")))
         
-        # Scroll the dropdown into view
-        driver.execute_script("arguments[0].scrollIntoView(true);", dropdown_table)
+            # Scroll the dropdown into view
+            driver.execute_script("arguments[0].scrollIntoView(true);", dropdown_table)
         
-        first_option = wait.until(EC.element_to_be_clickable((By.TAG_NAME, "tr")))
-        driver.execute_script("arguments[0].click();", first_option)
-        time.sleep(3)
-
-        # Click on "10-K & 10-Q" section using JavaScript
-        ten_k_section = wait.until(EC.presence_of_element_located((By.XPATH, "//h5[contains(., '10-K')]")))
-        driver.execute_script("arguments[0].click();", ten_k_section)
-        time.sleep(2)
-
-        # Click "View all" using JavaScript
-        view_all_button = wait.until(EC.presence_of_element_located((By.XPATH, "//button[contains(text(), 'View all 10-Ks and 10-Qs')]")))
-        driver.execute_script("arguments[0].click();", view_all_button)
-        time.sleep(3)
-
-        # Find the scroll div and extract links
-        scroll_div = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "dataTables_scroll")))
+            first_option = wait.until(EC.element_to_be_clickable((By.TAG_NAME, "tr")))
+            driver.execute_script("arguments[0].click();", first_option)
+            wait_for_page(driver, "sec_links.company_page", until=EC.presence_of_element_located((By.XPATH, "//h5[contains(., '10-K')]")))
+
+            # Click on "10-K & 10-Q" section using JavaScript
+            ten_k_section = wait.until(EC.presence_of_element_located((By.XPATH, "//h5[contains(., '10-K')]")))
+            driver.execute_script("arguments[0].click();", ten_k_section)
+
+            # Click "View all" using JavaScript
+            view_all_button = wait.until(EC.presence_of_element_located((By.XPATH, "//button[contains(text(), 'View all 10-Ks and 10-Qs')]")))
+            driver.execute_script("arguments[0].click();", view_all_button)
+            wait_for_page(driver, "sec_links.filings_table", until=EC.presence_of_element_located((By.CLASS_NAME, "document-link")))
+
+            # Find the scroll div and extract links
+            scroll_div = wait.until(EC.presence_of_element_located((By.CLASS_NAME, "dataTables_scroll")))
         
-        # Scroll through the div to load all content
-        last_height = driver.execute_script("return arguments[0].scrollHeight", scroll_div)
-        while True:
-            driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", scroll_div)
-            time.sleep(2)
-            new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_div)
-            if new_height == last_height:
-                break
-            last_height = new_height
-
-        # Extract links
-        report_links = scroll_div.find_elements(By.CLASS_NAME, "document-link")
-        links = [link.get_attribute("href") for link in report_links]
-
-        print(f"Found {len(links)} 10-K reports for {ticker}")
-        return links
-    
-    except Exception as e:
-        print(f"Error fetching 10-K filings for {ticker}: {e}")
-        return []
-    
-    finally:
-        driver.quit()
-
-# Read companies from CSV
-companies = []  
-tickers = []   
-with open("companies.csv", mode="r", encoding="utf-8") as file:
-    reader = csv.reader(file)
-    for row in reader:
-        for entry in row: 
-            match = re.match(r"(.+?)\s\((\w+)\)", entry.strip()) 
-            if match:
-                company_name, ticker = match.groups()
-                companies.append(company_name)
-                tickers.append(ticker)
-
-# Write links to CSV
-with open("10k_links.csv", "a", newline="") as file:
-    writer = csv.writer(file)
+            # Scroll through the div to load all content
+            last_height = driver.execute_script("return arguments[0].scrollHeight", scroll_div)
+            while True:
+                driver.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", scroll_div)
+                # More rows are in as soon as the table grows; a quiet network means there are none left
+                wait_for_page(driver, "sec_links.scroll", timeout=5, until=lambda d: d.execute_script(
+                    "return arguments[0].scrollHeight", scroll_div) > last_height)
+                new_height = driver.execute_script("return arguments[0].scrollHeight", scroll_div)
+                if new_height == last_height:
+                    break
+                last_height = new_height
+
+            # Extract links
+            report_links = scroll_div.find_elements(By.CLASS_NAME, "document-link")
+            links = [link.get_attribute("href") for link in report_links]
+
+            print(f"Found {len(links)} 10-K reports for {ticker}")
+            return links
     
+        except Exception as e:
+            print(f"Error fetching 10-K filings for {ticker}: {e}")
+            return []
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect 10-K/10-Q document links into 10k_links.csv.")
+    parser.add_argument("--selenium-fallback", action="store_true",
+                        help="scrape the EDGAR search UI for tickers missing from company_tickers.json")
+    args = parser.parse_args()
+
+    tickers = read_tickers("companies.csv")
+    # Resolved tickers survive a crash; the Selenium fallback in particular is slow
+    checkpoint = Checkpoint("sec_links")
+    pending = [ticker for ticker in tickers if ticker not in checkpoint]
+    resolved = asyncio.run(resolve_10k_links(pending)) if pending else {}
+    checkpoint.save_many(resolved)
+
+    for ticker in pending:
+        if ticker not in resolved and args.selenium_fallback:
+            links = get_all_10k_links(ticker)
+            if links:
+                checkpoint.save(ticker, links)
+
+    # Merge with the links earlier runs collected, without duplicates
+    rows = []
+    if os.path.exists(LINKS_FILE):
+        with open(LINKS_FILE, "r", newline="") as file:
+            rows = [tuple(row) for row in csv.reader(file) if row]
     for ticker in tickers:
-        links = get_all_10k_links(ticker)
+        links = checkpoint.get(ticker, [])
         print("links:", links)
-        
-        for link in links:
-            writer.writerow([ticker, link])
\ No newline at end of file
+        rows.extend((ticker, link) for link in links)
+
+    # Write links to CSV
+    output = io.StringIO()
+    csv.writer(output).writerows(dict.fromkeys(rows))
+    atomic_write(LINKS_FILE, output.getvalue())
+    checkpoint.finish()
+
+if __name__ == "__main__":
+    main()
@@ -1,119 +1,152 @@
-import requests
+import argparse
+import asyncio
 import json
-import time
 import pandas as pd
 from datetime import datetime
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Tuple
+
+from sec_client import SECClient, SEC_BASE_URL
+from xbrl_normalizer import normalize_company_facts, latest_values, json_number
+from fact_store import write_fact_store, FACT_STORE_DIR
+from edgar_bulk import read_bulk_companies
+from sec_links_scrapper import read_tickers, load_ticker_ciks
+
+# us-gaap concepts summarized per company, in output order
+ESSENTIAL_METRICS = {
+    'Revenue': 'Total revenue',
+    'NetIncomeLoss': 'Net income/loss',
+    'OperatingIncomeLoss': 'Operating income',
+    'Assets': 'Total assets',
+    'Liabilities': 'Total liabilities'
+}
 
 class CompanyAnalyzer:
-    def __init__(self, user_agent: str = 'Company Name (email@domain.com)'):
-        self.headers = {
-            'User-Agent': user_agent,
-            'Accept': 'application/json',
-            'Host': 'data.sec.gov'
-        }
+    def __init__(self, user_agent: str = 'Company Name (email@domain.com)', base_url: str = SEC_BASE_URL):
+        self.client = SECClient(user_agent, base_url=base_url)
     
     def _format_cik(self, cik: str) -> str:
         """Format CIK to 10 digits with leading zeros"""
-        return str(int(cik)).zfill(10)
+        return SECClient.format_cik(cik)
 
-    def get_company_facts(self, cik: str) -> Dict:
+    async def get_company_facts(self, cik: str) -> Dict:
         """Get company facts including financial data"""
-        cik_padded = self._format_cik(cik)
-        url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik_padded}.json"
-        
-        try:
-            print(f"Requesting URL: {url}")
-            time.sleep(0.1)  # SEC rate limit compliance
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching company facts: {e}")
-            return None
+        return await self.client.get_company_facts(cik)
 
-    def get_company_info(self, cik: str) -> Dict:
+    async def get_company_info(self, cik: str) -> Dict:
         """Get company submission information"""
-        cik_padded = self._format_cik(cik)
-        url = f"https://data.sec.gov/submissions/CIK{cik_padded}.json"
-        
-        try:
-            print(f"Requesting URL: {url}")
-            time.sleep(0.1)
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching company info: {e}")
-            return None
+        return await self.client.get_company_info(cik)
+
+    async def fetch_companies(self, ciks: Iterable[str]) -> Dict[str, Tuple[Dict, Dict]]:
+        """Fetch facts and submissions for every CIK concurrently over one pooled connection"""
+        ciks = list(dict.fromkeys(ciks))
+        async with self.client:
+            facts, info = await asyncio.gather(
+                self.client.get_many(ciks, self.get_company_facts),
+                self.client.get_many(ciks, self.get_company_info),
+            )
+        return {cik: (facts[cik], info[cik]) for cik in ciks}
 
     def extract_latest_metrics(self, facts_data: Dict) -> Dict:
         """Extract the most recent values for key metrics from company facts"""
         if not facts_data or 'facts' not in facts_data:
             return {}
 
-        essential_metrics = {
-            'Revenue': 'Total revenue',
-            'NetIncomeLoss': 'Net income/loss',
-            'OperatingIncomeLoss': 'Operating income',
-            'Assets': 'Total assets',
-            'Liabilities': 'Total liabilities'
-        }
-        
-        metrics = {}
-        us_gaap_data = facts_data.get('facts', {}).get('us-gaap', {})
-        
-        for metric_key, metric_name in essential_metrics.items():
-            if metric_key in us_gaap_data:
-                metric_data = us_gaap_data[metric_key]
-                if 'units' in metric_data:
-                    # Usually 'USD' for financial values
-                    unit_type = next(iter(metric_data['units']))
-                    values = metric_data['units'][unit_type]
-                    
-                    # Filter for 10-K filings and get the most recent
-                    annual_values = [v for v in values if v.get('form') == '10-K']
-                    if annual_values:
-                        latest = max(annual_values, key=lambda x: x.get('end', ''))
-                        metrics[metric_name] = {
-                            'value': latest.get('val'),
-                            'date': latest.get('end'),
-                            'unit': unit_type
-                        }
-        
-        return metrics
+        cik = self._format_cik(facts_data.get('cik', 0))
+        facts = normalize_company_facts({cik: facts_data})
+        return self.latest_metrics_by_cik(facts).get(cik, {})
 
-def main():
-    analyzer = CompanyAnalyzer(user_agent='Your Company Name (your.email@domain.com)')  
-    
+    def latest_metrics_by_cik(self, facts: pd.DataFrame) -> Dict[str, Dict]:
+        """Latest 10-K value of each essential metric for every company in a normalized facts frame"""
+        latest = latest_values(facts, ESSENTIAL_METRICS)
+        found = {(row.cik, row.concept): row for row in latest.itertuples(index=False)}
+
+        metrics_by_cik = {}
+        for cik in latest['cik'].unique():
+            metrics = {}
+            for metric_key, metric_name in ESSENTIAL_METRICS.items():
+                row = found.get((cik, metric_key))
+                if row is not None:
+                    metrics[metric_name] = {
+                        'value': json_number(row.value),
+                        'date': row.end.strftime('%Y-%m-%d'),
+                        'unit': row.unit
+                    }
+            metrics_by_cik[cik] = metrics
+        return metrics_by_cik
+
+async def companies_csv_ciks(analyzer: CompanyAnalyzer) -> Dict[str, str]:
+    """Maps the tickers in companies.csv to CIKs through SEC's ticker map"""
+    async with analyzer.client:
+        known = await load_ticker_ciks(analyzer.client)
+    ticker_ciks = {}
+    for ticker in read_tickers("companies.csv"):
+        if ticker.upper() in known:
+            ticker_ciks[ticker] = known[ticker.upper()]
+        else:
+            print(f"No CIK found for {ticker}")
+    return ticker_ciks
+
+def links_csv_ciks() -> Dict[str, str]:
+    """Maps each ticker in 10k_links.csv to the CIK in its filing URLs"""
     try:
         df = pd.read_csv('10k_links.csv', header=None, names=['ticker', 'url'])
     except Exception as e:
         print(f"Error reading CSV: {e}")
-        return
-    
-    company_data = {}
+        return None
     
+    # Several 10-K/10-Q rows share a ticker; every row of a ticker resolves to the same CIK
+    ticker_ciks = {}
     for _, row in df.iterrows():
         ticker = row['ticker']
+        if ticker in ticker_ciks:
+            continue
         cik_match = re.search(r'/edgar/data/(\d+)/', row['url'])
         
         if not cik_match:
             print(f"Could not extract CIK from URL for {ticker}")
             continue
-            
-        cik = cik_match.group(1)
+        ticker_ciks[ticker] = cik_match.group(1)
+    
+    return ticker_ciks
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize SEC financial data for the companies in 10k_links.csv.")
+    parser.add_argument("--bulk-dir", metavar="PATH",
+                        help="read companyfacts.zip/submissions.zip from PATH instead of calling the API; "
+                             "companies come from companies.csv")
+    args = parser.parse_args()
+
+    analyzer = CompanyAnalyzer(user_agent='Your Company Name (your.email@domain.com)')  
+    
+    if args.bulk_dir:
+        ticker_ciks = asyncio.run(companies_csv_ciks(analyzer))
+        fetched = read_bulk_companies(args.bulk_dir, ticker_ciks.values())
+        ticker_ciks = {ticker: analyzer._format_cik(cik) for ticker, cik in ticker_ciks.items()}
+    else:
+        ticker_ciks = links_csv_ciks()
+        if ticker_ciks is None:
+            return
+        fetched = asyncio.run(analyzer.fetch_companies(ticker_ciks.values()))
+    
+    # Latest value per concept for every company at once
+    facts = normalize_company_facts({analyzer._format_cik(cik): facts_data for cik, (facts_data, _) in fetched.items()})
+    metrics_by_cik = analyzer.latest_metrics_by_cik(facts)
+    
+    # Keep every fact in the columnar store for downstream readers
+    write_fact_store(facts, {analyzer._format_cik(cik): ticker for ticker, cik in ticker_ciks.items()})
+    print(f"Saved {len(facts)} facts to {FACT_STORE_DIR}/")
+    company_data = {}
+    
+    for ticker, cik in ticker_ciks.items():
         print(f"\nAnalyzing {ticker} (CIK: {cik})...")
+        facts_data, company_info = fetched[cik]
         
-        # Get company facts data
-        facts_data = analyzer.get_company_facts(cik)
         if not facts_data:
             print(f"Could not retrieve data for {ticker}")
             continue
         
-        # Get company info for latest filing date
-        company_info = analyzer.get_company_info(cik)
+        # Get latest filing date from company info
         latest_10k_date = None
         if company_info and 'filings' in company_info:
             recent_filings = company_info['filings']['recent']
@@ -122,8 +155,7 @@ def main():
                     latest_10k_date = recent_filings['reportDate'][idx]
                     break
         
-        # Extract metrics
-        metrics = analyzer.extract_latest_metrics(facts_data)
+        metrics = metrics_by_cik.get(analyzer._format_cik(cik), {})
         
         if metrics:
             company_data[ticker] = {
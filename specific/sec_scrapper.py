@@ -1,11 +1,12 @@
 import csv  # For reading companies.csv
-import requests
+import asyncio
 import json
-import time
 import pandas as pd
 from datetime import datetime
 import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Tuple
+
+from sec_client import SECClient, SEC_BASE_URL
 
 def verify_companies():
     with open("companies.csv", mode="r", encoding="utf-8") as file:
@@ -14,46 +15,30 @@ def verify_companies():
             print(f"Processing row: {row}")
             
 class CompanyAnalyzer:
-    def __init__(self, user_agent: str = 'Company Name (email@domain.com)'):
-        self.headers = {
-            'User-Agent': user_agent,
-            'Accept': 'application/json',
-            'Host': 'data.sec.gov'
-        }
+    def __init__(self, user_agent: str = 'Company Name (email@domain.com)', base_url: str = SEC_BASE_URL):
+        self.client = SECClient(user_agent, base_url=base_url)
     
     def _format_cik(self, cik: str) -> str:
         """Format CIK to 10 digits with leading zeros"""
-        return str(int(cik)).zfill(10)
+        return SECClient.format_cik(cik)
 
-    def get_company_facts(self, cik: str) -> Dict:
+    async def get_company_facts(self, cik: str) -> Dict:
         """Get company facts including financial data"""
-        cik_padded = self._format_cik(cik)
-        url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik_padded}.json"
-        
-        try:
-            print(f"Requesting URL: {url}")
-            time.sleep(0.1)  # SEC rate limit compliance
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching company facts: {e}")
-            return None
+        return await self.client.get_company_facts(cik)
 
-    def get_company_info(self, cik: str) -> Dict:
+    async def get_company_info(self, cik: str) -> Dict:
         """Get company submission information"""
-        cik_padded = self._format_cik(cik)
-        url = f"https://data.sec.gov/submissions/CIK{cik_padded}.json"
-        
-        try:
-            print(f"Requesting URL: {url}")
-            time.sleep(0.1)
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"Error fetching company info: {e}")
-            return None
+        return await self.client.get_company_info(cik)
+
+    async def fetch_companies(self, ciks: Iterable[str]) -> Dict[str, Tuple[Dict, Dict]]:
+        """Fetch facts and submissions for every CIK concurrently over one pooled connection"""
+        ciks = list(dict.fromkeys(ciks))
+        async with self.client:
+            facts, info = await asyncio.gather(
+                self.client.get_many(ciks, self.get_company_facts),
+                self.client.get_many(ciks, self.get_company_info),
+            )
+        return {cik: (facts[cik], info[cik]) for cik in ciks}
 
     def extract_latest_metrics(self, facts_data: Dict) -> Dict:
         """Extract the most recent values for key metrics from company facts"""
@@ -117,10 +102,10 @@ def main():
         print(f"Error reading CSV: {e}")
         return
     
-    company_data = {}
     processed_tickers = set()  # 5. Track processed companies
+    ticker_ciks = {}
 
-    # 6. Modified main processing loop
+    # 6. Collect CIKs first; requests are paced by the shared SEC rate limiter
     for _, row in df.iterrows():
         ticker = row['ticker']
         print(f"=== Processing row {_} ===")
@@ -132,25 +117,26 @@ def main():
             continue
         processed_tickers.add(ticker)
         
-        time.sleep(1)  # Rate limiting
         cik_match = re.search(r'/edgar/data/(\d+)/', row['url'])
         
         if not cik_match:
             print(f"Could not extract CIK from URL for {ticker}")
             continue
             
-        cik = cik_match.group(1)
+        ticker_ciks[ticker] = cik_match.group(1)
+
+    fetched = asyncio.run(analyzer.fetch_companies(ticker_ciks.values()))
+    company_data = {}
+
+    for ticker, cik in ticker_ciks.items():
         print(f"\nAnalyzing {ticker} (CIK: {cik})...")
+        facts_data, company_info = fetched[cik]
         
-        
-        # Get company facts data
-        facts_data = analyzer.get_company_facts(cik)
         if not facts_data:
             print(f"Could not retrieve data for {ticker}")
             continue
         
-        # Get company info for latest filing date
-        company_info = analyzer.get_company_info(cik)
+        # Get latest filing date from company info
         latest_10k_date = None
         if company_info and 'filings' in company_info:
             recent_filings = company_info['filings']['recent']
@@ -1,41 +1,12 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
 import json
 import re
 import csv
-def clean_article_content(text):
-    """Clean and format article content by removing financial tables and unwanted patterns."""
-    # Remove financial statement patterns
-    patterns_to_remove = [
-        r'\([^)]*thousands[^)]*\)',
-        r'(?s)As of.*?Assets',
-        r'(?s)Current assets:.*?Total current assets',
-        r'(?s)Stockholders.[^ ]*\s*Equity:.*?Total stockholders.[^ ]*\s*equity',
-        r'(?s)Condensed Consolidated Statements.*?\d{4}',
-        r'\$\s*\d{1,3}(?:,\d{3})*(?:\.\d+)?',  # Currency amounts
-        r'\d{1,3}(?:,\d{3})*(?:\.\d+)?%?'  # Numbers and percentages
-    ]
-    
-    cleaned_text = text
-    for pattern in patterns_to_remove:
-        cleaned_text = re.sub(pattern, '', cleaned_text)
-    
-    # Remove multiple spaces and newlines
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-    return cleaned_text.strip()
 
-def initialize_driver():
-    """Initialize Chrome driver with headless mode and other options."""
-    chrome_options = Options()
-    chrome_options.add_argument('--ignore-certificate-errors')
-    chrome_options.add_argument('--headless') 
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    return webdriver.Chrome(options=chrome_options)
+from browser_pool import get_pool
+from text_cleaning import clean_article_content
 
 def scrape_news_articles(driver, ticker, results_dict):
     """Scrape news articles for a given ticker and update results dictionary."""
@@ -128,19 +99,15 @@ def main():
     # tickers = ["MLNK", "PD", "AMPL", "CMPO", "WEAV", "VNET", "EGHT"]
     results = {}
     
-    driver = initialize_driver()
-    
-    try:
+    # One pooled Chrome for every ticker, returned to the pool afterwards
+    with get_pool().borrow() as driver:
         for ticker in tickers:
             print(f"\nStarting to scrape {ticker}")
             scrape_news_articles(driver, ticker, results)
             
-        # Write results to JSON file
-        with open('yahoo_results_1.json', 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-            
-    finally:
-        driver.quit()
+    # Write results to JSON file
+    with open('yahoo_results_1.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+EVICTION_BATCH = 100  # Least recently used entries read per eviction query
+RESYNC_INTERVAL = 60 * 60  # Seconds between expiry sweeps and recounts of the running size
+
+
+def compress(data: bytes) -> bytes:
+    return zlib.compress(data, 6)
+
+
+def pack_text(text: Optional[str]) -> Optional[bytes]:
+    return compress(text.encode("utf-8")) if text is not None else None
+
+
+def unpack_text(blob: Optional[bytes]) -> Optional[str]:
+    return zlib.decompress(blob).decode("utf-8") if blob is not None else None
+
+
+class Validators:
+    """Freshness and conditional requests for a stored response with ``etag``, ``last_modified`` and ``stored_at``."""
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that let the server answer 304 Not Modified instead of resending the body."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class SQLiteCache:
+    """
+    A size-capped SQLite file (WAL, so several processes can share it) whose
+    least recently used entries go first.
+
+    Subclasses name their ``TABLE`` and its ``KEY`` columns; the table needs
+    ``size`` and an indexed ``accessed_at`` column. The size of the cache is
+    kept as a running total, so a write only queries the table when it
+    has to evict; it is recounted every RESYNC_INTERVAL, after ``_expire``,
+    to pick up what other processes sharing the file wrote or evicted.
+    """
+    TABLE = None
+    KEY: Tuple[str, ...] = ()
+
+    def __init__(self, path: str, schema: str, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(schema)
+        self._conn.commit()
+        self._where_key = " AND ".join(f"{column} = ?" for column in self.KEY)
+        self._total = self._total_bytes()
+        self._synced_at = time.time()
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+
+    def _size_of(self, key: Tuple) -> Optional[int]:
+        row = self._conn.execute(f"SELECT size FROM {self.TABLE} WHERE {self._where_key}", key).fetchone()
+        return row[0] if row else None
+
+    def _remove(self, key: Tuple, size: int):
+        self._conn.execute(f"DELETE FROM {self.TABLE} WHERE {self._where_key}", key)
+        self._total -= size
+
+    def _expire(self, now: float):
+        """Drops entries too old to be worth revalidating; nothing by default."""
+
+    def _evict(self):
+        """While over max_bytes, drops least recently used entries, a batch at a time off the accessed_at index."""
+        now = time.time()
+        if now - self._synced_at >= RESYNC_INTERVAL:
+            self._synced_at = now
+            self._expire(now)
+            self._total = self._total_bytes()
+
+        while self._total > self.max_bytes:
+            victims = self._conn.execute(f"SELECT {', '.join(self.KEY)}, size FROM {self.TABLE} "
+                                         "ORDER BY accessed_at LIMIT ?", (EVICTION_BATCH,)).fetchall()
+            if not victims:
+                break
+            for *key, size in victims:
+                self._remove(tuple(key), size)
+                if self._total <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
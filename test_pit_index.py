@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from pit_index import AmbiguousPeriod, PointInTimeIndex
+
+CIK = "0000320193"
+
+
+def facts(rows):
+    return pd.DataFrame([
+        {'cik': CIK, 'concept': concept, 'start': pd.Timestamp(start) if start else pd.NaT,
+         'end': pd.Timestamp(end), 'filed': pd.Timestamp(filed), 'value': value,
+         'accn': accn, 'form': form, 'unit': 'USD', 'unit_order': 0}
+        for concept, start, end, filed, value, accn, form in rows
+    ])
+
+
+def test_duration_concept_found_without_period_start():
+    index = PointInTimeIndex(facts([
+        ('Revenues', '2024-01-01', '2024-03-31', '2024-05-01', 100.0, 'a1', '10-Q'),
+        ('Revenues', '2024-01-01', '2024-03-31', '2024-08-01', 110.0, 'a2', '10-Q/A'),
+    ]))
+
+    assert index.value_as_of(CIK, 'Revenues', '2024-03-31', '2024-06-01') == 100.0
+    assert index.value_as_of(CIK, 'Revenues', '2024-03-31', '2024-09-01') == 110.0
+    assert index.value_as_of(CIK, 'Revenues', '2024-03-31', '2024-04-01') is None
+    assert index.value_as_of(CIK, 'Revenues', '2024-06-30', '2024-09-01') is None
+
+
+def test_several_durations_ending_on_the_same_date_are_ambiguous():
+    index = PointInTimeIndex(facts([
+        ('Revenues', '2024-04-01', '2024-06-30', '2024-08-01', 120.0, 'b1', '10-Q'),
+        ('Revenues', '2024-01-01', '2024-06-30', '2024-08-01', 230.0, 'b1', '10-Q'),
+    ]))
+
+    with pytest.raises(AmbiguousPeriod):
+        index.value_as_of(CIK, 'Revenues', '2024-06-30', '2024-09-01')
+    assert index.value_as_of(CIK, 'Revenues', '2024-06-30', '2024-09-01', period_start='2024-04-01') == 120.0
+    assert index.value_as_of(CIK, 'Revenues', '2024-06-30', '2024-09-01', period_start='2024-01-01') == 230.0
+
+
+def test_instant_concept():
+    index = PointInTimeIndex(facts([
+        ('Assets', None, '2024-03-31', '2024-05-01', 5.0, 'a1', '10-Q'),
+    ]))
+
+    assert index.value_as_of(CIK, 'Assets', '2024-03-31', '2024-06-01') == 5.0
@@ -0,0 +1,96 @@
+import re
+from typing import List, Tuple
+
+# Boilerplate left behind by paywalls and consent banners
+IRRELEVANT_PHRASES = [
+    "sign up", "subscribe to continue", "get full access",
+    "create a free account", "already have an account",
+    "log in to access", "start your free trial", "cookie policy"
+]
+
+# One alternation over every phrase: a single scan tells whether a document has any at all
+PHRASE_RE = re.compile("|".join(re.escape(phrase) for phrase in IRRELEVANT_PHRASES))
+
+THOUSANDS_RE = re.compile(r'\([^)]*thousands[^)]*\)')
+STOCKHOLDERS_EQUITY_RE = re.compile(r'(?s)Stockholders.[^ ]*\s*Equity:.*?Total stockholders.[^ ]*\s*equity')
+FOUR_DIGITS_RE = re.compile(r'\d{4}')
+# Currency amounts, then any other numbers and percentages. These stay two
+# passes: removing "$ 1" from "2024$ 1%" lets the second one take "4%" too.
+CURRENCY_RE = re.compile(r'\$\s*\d{1,3}(?:,\d{3})*(?:\.\d+)?')
+NUMBER_RE = re.compile(r'\d{1,3}(?:,\d{3})*(?:\.\d+)?%?')
+
+# Financial statement spans as (start, end) literals, removed like
+# re.sub(r'(?s)<start>.*?<end>', '', text) but found with str.find, so a
+# start without a matching end costs one scan instead of a rescan of the rest
+# of the document for every occurrence.
+STATEMENT_SPANS: List[Tuple[str, str]] = [
+    ("As of", "Assets"),
+    ("Current assets:", "Total current assets"),
+]
+
+
+def collapse_whitespace(text: str) -> str:
+    """Same as re.sub(r'\\s+', ' ', text).strip(): both use str.isspace's notion of whitespace."""
+    return ' '.join(text.split())
+
+
+def strip_phrases(text: str) -> str:
+    """Removes IRRELEVANT_PHRASES, with the same result as replacing them one after another."""
+    if PHRASE_RE.search(text) is None:
+        return text
+    # Removing one phrase can join the text around it into another, so the
+    # (rare) documents that have any keep the original replace order
+    for phrase in IRRELEVANT_PHRASES:
+        text = text.replace(phrase, '')
+    return text
+
+
+def clean_text(text):
+    """Cleans the extracted text by removing irrelevant content."""
+    if not text:
+        return ""
+
+    return strip_phrases(collapse_whitespace(text))
+
+
+def _strip_span(text: str, start: str, end) -> str:
+    """Removes every `start ... end` span, shortest first; ``end`` is a literal or a compiled pattern."""
+    pieces = []
+    pos = 0
+    while True:
+        i = text.find(start, pos)
+        if i < 0:
+            break
+        if isinstance(end, str):
+            j = text.find(end, i + len(start))
+            span_end = j + len(end)
+        else:
+            match = end.search(text, i + len(start))
+            j = match.start() if match else -1
+            span_end = match.end() if match else -1
+        if j < 0:
+            break  # No end after this start, so none after any later start either
+        pieces.append(text[pos:i])
+        pos = span_end
+    if not pieces:
+        return text
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def clean_article_content(text):
+    """Clean and format article content by removing financial tables and unwanted patterns."""
+    # Each pass only runs if the literal it needs is present at all
+    if "thousands" in text:
+        text = THOUSANDS_RE.sub('', text)
+    for start, end in STATEMENT_SPANS:
+        text = _strip_span(text, start, end)
+    if "Stockholders" in text and "Total stockholders" in text:
+        text = STOCKHOLDERS_EQUITY_RE.sub('', text)
+    text = _strip_span(text, "Condensed Consolidated Statements", FOUR_DIGITS_RE)
+    if "$" in text:
+        text = CURRENCY_RE.sub('', text)
+    text = NUMBER_RE.sub('', text)
+
+    # Remove multiple spaces and newlines
+    return collapse_whitespace(text)
@@ -1,53 +1,34 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 import re
 import datetime
 from googlesearch import search
 import csv
 import re
 from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
 
-# Configure Selenium WebDriver
-chrome_options = Options()
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option("useAutomationExtension", False)
-chrome_options.add_argument("--headless")
-
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
-driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+from browser_pool import get_pool
+from page_extractor import extract_text
+from dom_extract import page_texts
+from text_cleaning import clean_text
+from page_ready import wait_for_page
+from jsonl_sink import JsonlSink, compact_legacy
+from checkpoint import Checkpoint
 
 # Define the list of companies and their tickers
 
 
+LINKS_PER_QUERY = 10
+RESULTS_PER_QUERY = 3
+# Google rate-limits searches, so these stay few; page fetches are I/O bound
+SEARCH_WORKERS = int(os.getenv("WEB_SEARCH_SEARCH_WORKERS", "2"))
+FETCH_WORKERS = int(os.getenv("WEB_SEARCH_FETCH_WORKERS", "8"))
+
 # Get the current year dynamically
 CURRENT_YEAR = datetime.datetime.now().year
 
-def clean_text(text):
-    """Cleans the extracted text by removing irrelevant content."""
-    if not text:
-        return ""
-
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    irrelevant_phrases = [
-        "sign up", "subscribe to continue", "get full access", 
-        "create a free account", "already have an account", 
-        "log in to access", "start your free trial", "cookie policy"
-    ]
-    for phrase in irrelevant_phrases:
-        text = text.replace(phrase, '')
-
-    return text
-
 def search_google_with_library(query, max_links=5):
     """Uses the googlesearch library to fetch search result URLs."""
     links = []
@@ -59,7 +40,7 @@ def search_google_with_library(query, max_links=5):
         print(f"Error fetching Google search results: {e}")
     return links
 
-def handle_cookies_and_popups():
+def handle_cookies_and_popups(driver):
     """Handles cookie consent popups and overlays on a webpage."""
     cookie_selectors = [
         'button:contains("Accept all")', 
@@ -75,7 +56,7 @@ def handle_cookies_and_popups():
             cookie_button = driver.find_element(By.CSS_SELECTOR, selector)
             if cookie_button.is_displayed():
                 cookie_button.click()
-                time.sleep(2)
+                wait_for_page(driver, "web_search.cookie_banner", until=EC.invisibility_of_element(cookie_button), timeout=2)
                 break  
         except:
             continue  
@@ -92,26 +73,30 @@ def handle_cookies_and_popups():
         for popup in popups:
             try:
                 popup.click()
-                time.sleep(2)
+                wait_for_page(driver, "web_search.popup", until=EC.invisibility_of_element(popup), timeout=2)
                 break  
             except:
                 continue  
 
 
 def scrape_page(url):
-    """Extracts text from a webpage while handling popups and cookies."""
+    """Extracts text from a webpage, rendering it in Chrome only when the static HTML has too little text."""
     if not url or not isinstance(url, str):
         return ""
 
+    return extract_text(url, scrape_page_with_browser, clean_text, min_length=200)
+
+def scrape_page_with_browser(url):
+    """Extracts text from a webpage while handling popups and cookies."""
     try:
-        driver.set_page_load_timeout(30)  # Set a timeout for page load
-        driver.get(url)
-        time.sleep(3)
+        with get_pool().borrow() as driver:
+            driver.set_page_load_timeout(30)  # Set a timeout for page load
+            driver.get(url)
+            wait_for_page(driver, "web_search.page")
 
-        handle_cookies_and_popups()
+            handle_cookies_and_popups(driver)
 
-        paragraphs = driver.find_elements(By.TAG_NAME, "p")
-        text_content = " ".join([p.text for p in paragraphs if p.text.strip()])
+            text_content = " ".join(page_texts(driver))
 
         text_content = clean_text(text_content)
 
@@ -125,6 +110,86 @@ def scrape_page(url):
         print(f"Error scraping {url}: {e}")
         return ""
 
+def search_all(jobs, workers=SEARCH_WORKERS, checkpoint=None):
+    """
+    Runs every (company, query) search up front; returns the result links per job, in job order.
+    Searches already in ``checkpoint`` are not repeated, and new ones are saved to it.
+    """
+    def search(query):
+        if checkpoint is not None and query in checkpoint:
+            return checkpoint.get(query)
+        print(f"Searching: {query}")
+        links = search_google_with_library(query, max_links=LINKS_PER_QUERY)
+        if checkpoint is not None and links:  # An empty result may be a transient block; retry it next run
+            checkpoint.save(query, links)
+        return links
+
+    queries = list(dict.fromkeys(query for company, query in jobs))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        links_by_query = dict(zip(queries, executor.map(search, queries)))
+    return [links_by_query[query] for company, query in jobs]
+
+def fetch_unique(urls, texts, workers=FETCH_WORKERS):
+    """Scrapes the URLs not in ``texts`` yet, concurrently, and adds their text to it."""
+    pending = [url for url in dict.fromkeys(urls) if url not in texts]
+
+    def fetch(url):
+        print(f"Scraping: {url}")
+        return scrape_page(url)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        texts.update(zip(pending, executor.map(fetch, pending)))
+
+def search_and_fetch(jobs, checkpoint=None):
+    """
+    Resolves every (company, query) job to its first RESULTS_PER_QUERY links
+    with more than 200 characters of text, like the serial loop did, but
+    fetches each unique URL once per run and many at a time.
+
+    Links are fetched in rounds: each round takes, for every job still short
+    of results, only as many of its next links as it still needs, so a job
+    never causes more fetches than walking its links in order would.
+
+    Yields (job, records) in job order, each job as soon as it and every
+    job before it are resolved, so stock_data.json keeps the input order.
+    """
+    links_by_job = search_all(jobs, checkpoint=checkpoint)
+    texts = {}
+    fetched = [0] * len(jobs)  # Prefix of each job's links that has been fetched
+    resolved = [False] * len(jobs)
+    finished = {}  # Job index -> records, until every earlier job has been yielded
+    next_job = 0
+
+    def valid(link):
+        return len(texts.get(link, "")) > 200
+
+    while True:
+        wanted = []
+        for i, links in enumerate(links_by_job):
+            if resolved[i]:
+                continue
+            needed = RESULTS_PER_QUERY - sum(valid(link) for link in links[:fetched[i]])
+            if needed > 0 and fetched[i] < len(links):
+                wanted.extend(links[fetched[i]:fetched[i] + needed])
+                fetched[i] += needed
+                continue
+
+            resolved[i] = True
+            company, query = jobs[i]
+            # The same URL under two queries is one fetch but two records, as before
+            records = [{"Company": company, "Query": query, "URL": link, "Extracted Text": texts[link]}
+                       for link in [link for link in links if valid(link)][:RESULTS_PER_QUERY]]
+            if not records:
+                print(f"No result with enough content for: {query}")
+            finished[i] = records
+        while next_job in finished:
+            yield jobs[next_job], finished.pop(next_job)
+            next_job += 1
+        if not wanted:
+            break
+        fetch_unique(wanted, texts)
+        print(f"Fetched {len(texts)} unique URLs so far")
+
 def main(): 
     companies = []  
     tickers = []   
@@ -148,41 +213,30 @@ def main():
         "{ticker} stock technical analysis",  
     ]
 
-    results = []
-
-    for company, ticker in zip(companies, tickers):
-        print(f"\n=== Searching for: {company} ({ticker}) ===\n")
-
-        queries = [query.format(company=company, ticker=ticker, year=CURRENT_YEAR) for query in base_queries]
-
-        for query in queries:
-            print(f"Searching: {query}")
-            links = search_google_with_library(query, max_links=10)
-
-            valid_results = 0
-            for link in links:
-                if valid_results >= 3:
-                    break  
-
-                print(f"Scraping: {link}")
-                text = scrape_page(link)
-
-                if len(text) > 200:
-                    print('text:',text)
-                    print('valid_results:',valid_results)
-
-                    results.append({"Company": company, "Query": query, "URL": link, "Extracted Text": text})
-                    valid_results += 1
-
-                else:
-                    print("Skipping due to insufficient content.")
-                # time.sleep(random.uniform(3, 6))  
-
-    with open("stock_data.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4)
-
+    jobs = [(company, query.format(company=company, ticker=ticker, year=CURRENT_YEAR))
+            for company, ticker in zip(companies, tickers) for query in base_queries]
+    # Records are appended as each job resolves; a rerun after a crash skips finished jobs
+    sink = JsonlSink("stock_data.jsonl", ("Company", "Query", "URL"))
+    # Google searches are the slow, rate-limited part; keep their results until the run completes
+    checkpoint = Checkpoint("web_search_queries")
+    # Resolved jobs with their record count; a job with fewer than RESULTS_PER_QUERY isn't unfinished
+    resolved = Checkpoint("web_search_jobs")
+    pending = [job for job in jobs if "\t".join(job) not in resolved]
+    for job, records in search_and_fetch(pending, checkpoint):
+        sink.write_all(records)
+        resolved.save("\t".join(job), len(records))
+    sink.close()
+
+    # A resumed run appends the jobs it redid after later ones; the legacy file keeps the input order
+    job_order = {job: i for i, job in enumerate(jobs)}
+    compact_legacy("stock_data.jsonl", order=lambda record: job_order.get((record["Company"], record["Query"]), len(jobs)))
+    # Marked complete only once the legacy file is written, so a crash while compacting resumes the
+    # stream; resolved jobs are forgotten first, so a crash before the marker redoes them rather than
+    # leaving a fresh stream with every job marked resolved
+    resolved.finish()
+    sink.mark_complete()
+    checkpoint.finish()
     print("\nScraping complete. Data saved to stock_data.json.")
-    driver.quit()
 
 if __name__ == "__main__":
     main()
@@ -2,33 +2,26 @@ import os
 import time
 import csv
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.webdriver.support import expected_conditions as EC
 import random
 import datetime
 
-# Configure Selenium WebDriver for head mode
-chrome_options = Options()
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option("useAutomationExtension", False)
+from browser_pool import get_pool
+from page_ready import wait_for_page, Pacer
 
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+# Google blocks clients that search too often; keep 10-20 s between queries
+GOOGLE_PACER = Pacer("google.pacing", lambda: random.uniform(10, 20))
 
 def search_google(query, max_links=5):
     """Fetch search result URLs using Google Search via Selenium."""
     search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
-    driver.get(search_url)
-    time.sleep(random.uniform(3, 6))
+    with get_pool().borrow() as driver:
+        driver.get(search_url)
+        wait_for_page(driver, "google.results", until=EC.presence_of_element_located((By.CSS_SELECTOR, "div.yuRUbf a")))
 
-    search_results = driver.find_elements(By.CSS_SELECTOR, "div.yuRUbf a")
-    links = [result.get_attribute("href") for result in search_results if result.get_attribute("href")]
+        search_results = driver.find_elements(By.CSS_SELECTOR, "div.yuRUbf a")
+        links = [result.get_attribute("href") for result in search_results if result.get_attribute("href")]
     valid_links = [link for link in links if "google.com" not in link]
 
     return valid_links[:max_links]
@@ -63,7 +56,7 @@ def main():
         queries = [query.format(company=company, ticker=ticker, year=datetime.datetime.now().year) for query in base_queries]
 
         for query in queries:
-            time.sleep(random.uniform(10, 20))
+            GOOGLE_PACER.wait()
             print(f"Searching: {query}")
             links = search_google(query, max_links=5)
             results.extend(links)
@@ -74,7 +67,6 @@ def main():
         writer.writerows([[link] for link in results])
 
     print("Link extraction complete. Data saved to extracted_links.csv.")
-    driver.quit()
 
 if __name__ == "__main__":
     main()
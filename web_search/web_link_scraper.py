@@ -4,76 +4,59 @@ import json
 import re
 import datetime
 import csv
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from urllib.parse import urlparse
 
-# Configure Selenium WebDriver for headless mode
-chrome_options = Options()
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--headless=new")  # Run in headless mode
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option("useAutomationExtension", False)
-
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
+from browser_pool import get_pool
+from page_extractor import extract_dated_text, iso_date
+from dom_extract import extract_page
+from text_cleaning import clean_text
+from page_ready import wait_for_page
+from jsonl_sink import JsonlSink, compact_legacy
 
 CURRENT_DATE = datetime.datetime.now().strftime("%Y-%m-%d")
 
-def clean_text(text):
-    """Cleans extracted text by removing unnecessary content."""
-    if not text:
-        return ""
-
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    irrelevant_phrases = [
-        "sign up", "subscribe to continue", "get full access",
-        "create a free account", "already have an account",
-        "log in to access", "start your free trial", "cookie policy"
-    ]
-    for phrase in irrelevant_phrases:
-        text = text.replace(phrase, '')
-
-    return text
-
 def extract_source_name(url):
     """Extracts the domain name from a URL."""
     parsed_url = urlparse(url)
     return parsed_url.netloc.replace("www.", "")
 
 def scrape_page(url, retries=3):
-    """Extracts text from a webpage while handling popups and cookies."""
+    """
+    (date, text) of a webpage, rendering it in Chrome only when the static HTML has too little text.
+    The date is the page's own publication date, today if it doesn't show one.
+    """
     if not url or not isinstance(url, str):
-        return ""
+        return CURRENT_DATE, ""
+
+    page_date, text = extract_dated_text(url, lambda url: scrape_page_with_browser(url, retries),
+                                         clean_text, min_length=200)
+    return page_date or CURRENT_DATE, text
 
+def scrape_page_with_browser(url, retries=3):
+    """Extracts (date, text) from a webpage while handling popups and cookies; the date is None if the page has none."""
     for attempt in range(retries):
         try:
-            driver.get(url)
-            time.sleep(3)
+            with get_pool().borrow() as driver:
+                driver.get(url)
+                wait_for_page(driver, "web_link_scraper.page")
 
-            page_date = CURRENT_DATE  # Default to today if no date is found
-            paragraphs = driver.find_elements(By.TAG_NAME, "p")
-            text_content = " ".join([p.text for p in paragraphs if p.text.strip()])
-            text_content = clean_text(text_content)
+                page = extract_page(driver)
+            page_date = iso_date(page["time"])
+            text_content = clean_text(" ".join(page["texts"]))
 
             return page_date, text_content if len(text_content) > 200 else ""
 
         except TimeoutException:
             print(f"Timeout while loading {url}. Retrying... (Attempt {attempt + 1})")
-            if attempt == retries - 1:
-                return CURRENT_DATE, ""
         except Exception as e:
             print(f"Error scraping {url}: {e}")
-            return CURRENT_DATE, ""
+            break
+    return None, ""
 
 def main():
-    results = []
+    # Records are appended as pages are scraped; a rerun after a crash skips links already saved
+    sink = JsonlSink("scraped_data.jsonl", ("Source URL",))
 
     # Read extracted links from the CSV file
     with open("extracted_links.csv", mode="r", encoding="utf-8") as file:
@@ -81,6 +64,8 @@ def main():
         links = [row[0] for row in reader]
 
     for link in links:
+        if sink.has(link):
+            continue
         print(f"Scraping: {link}")
         page_date, text = scrape_page(link)
         if len(text) > 1000:
@@ -92,14 +77,14 @@ def main():
                 "Source URL": link,
                 "Extracted Text": text
             }
-            results.append(result)
+            sink.write(result)
+    sink.close()
 
-    # Save results to JSON files
-    with open("scraped_data.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4)
+    # Save results to JSON files, then mark the stream complete
+    compact_legacy("scraped_data.jsonl")
+    sink.mark_complete()
 
     print("Scraping complete. Data saved to scraped_data.json.")
-    driver.quit()
 
 if __name__ == "__main__":
     main()
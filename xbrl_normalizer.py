@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+
+# Low-cardinality string columns stored as categoricals
+CATEGORICAL_COLUMNS = ['cik', 'taxonomy', 'concept', 'unit', 'form', 'fp']
+DATE_COLUMNS = ['start', 'end', 'filed']
+FACT_COLUMNS = ['cik', 'taxonomy', 'concept', 'unit', 'unit_order', 'start', 'end',
+                'value', 'accn', 'fy', 'fp', 'form', 'filed', 'frame']
+
+
+def normalize_company_facts(facts_by_cik: Dict[str, Dict]) -> pd.DataFrame:
+    """
+    Flattens companyfacts payloads (facts -> taxonomy -> concept -> units -> [values])
+    for any number of companies into one typed frame with a row per reported fact.
+
+    ``unit_order`` is the position of the unit within its concept, so callers
+    can reproduce "first listed unit" choices without going back to the JSON.
+    """
+    records = []
+    keys = []
+    counts = []
+    for cik, facts_data in facts_by_cik.items():
+        if not facts_data:
+            continue
+        for taxonomy, concepts in facts_data.get('facts', {}).items():
+            for concept, concept_data in concepts.items():
+                for unit_order, (unit, values) in enumerate(concept_data.get('units', {}).items()):
+                    records.extend(values)
+                    keys.append((cik, taxonomy, concept, unit, unit_order))
+                    counts.append(len(values))
+
+    if not records:
+        return empty_facts_frame()
+
+    frame = pd.DataFrame.from_records(records)
+    counts = np.asarray(counts)
+    key_columns = list(zip(*keys))
+    for name, column in zip(['cik', 'taxonomy', 'concept', 'unit', 'unit_order'], key_columns):
+        frame[name] = np.repeat(np.asarray(column, dtype=object), counts)
+
+    frame = frame.rename(columns={'val': 'value'}).reindex(columns=FACT_COLUMNS)
+    return apply_fact_dtypes(frame)
+
+
+def empty_facts_frame() -> pd.DataFrame:
+    return apply_fact_dtypes(pd.DataFrame(columns=FACT_COLUMNS))
+
+
+def apply_fact_dtypes(frame: pd.DataFrame) -> pd.DataFrame:
+    frame['cik'] = frame['cik'].astype(str).str.zfill(10)
+    for column in CATEGORICAL_COLUMNS:
+        frame[column] = frame[column].astype('category')
+    for column in DATE_COLUMNS:
+        frame[column] = pd.to_datetime(frame[column], format='%Y-%m-%d', errors='coerce')
+    frame['value'] = pd.to_numeric(frame['value'], errors='coerce').astype('float64')
+    frame['unit_order'] = frame['unit_order'].astype('int16')
+    frame['fy'] = pd.to_numeric(frame['fy'], errors='coerce').astype('Int16')
+    return frame
+
+
+def latest_values(facts: pd.DataFrame, concepts: Optional[Iterable[str]] = None,
+                  form: str = '10-K', taxonomy: str = 'us-gaap') -> pd.DataFrame:
+    """
+    Latest reported value per (cik, concept) among ``form`` filings, computed for
+    every company and concept in one grouped operation.
+
+    Like the original per-company loop, only each concept's first listed unit is
+    considered, and ties on the period end keep the first reported fact.
+    """
+    mask = (facts['taxonomy'] == taxonomy) & (facts['unit_order'] == 0) & (facts['form'] == form)
+    if concepts is not None:
+        mask &= facts['concept'].isin(list(concepts))
+    candidates = facts[mask]
+    if candidates.empty:
+        return candidates
+
+    latest_idx = candidates.groupby(['cik', 'concept'], observed=True)['end'].idxmax()
+    return candidates.loc[latest_idx.dropna().values].reset_index(drop=True)
+
+
+def json_number(value: float):
+    """Turns float64 values back into the ints SEC reports them as, where they are whole."""
+    return int(value) if float(value).is_integer() else float(value)
@@ -1,46 +1,32 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from bs4 import BeautifulSoup
+import argparse
+import asyncio
+import httpx
+import os
 import re
 import csv
-def clean_article_content(text):
-    """Clean and format article content by removing financial tables and unwanted patterns."""
-    # Remove financial statement patterns
-    patterns_to_remove = [
-        r'\([^)]*thousands[^)]*\)',
-        r'(?s)As of.*?Assets',
-        r'(?s)Current assets:.*?Total current assets',
-        r'(?s)Stockholders.[^ ]*\s*Equity:.*?Total stockholders.[^ ]*\s*equity',
-        r'(?s)Condensed Consolidated Statements.*?\d{4}',
-        r'\$\s*\d{1,3}(?:,\d{3})*(?:\.\d+)?',  # Currency amounts
-        r'\d{1,3}(?:,\d{3})*(?:\.\d+)?%?'  # Numbers and percentages
-    ]
-    
-    cleaned_text = text
-    for pattern in patterns_to_remove:
-        cleaned_text = re.sub(pattern, '', cleaned_text)
-    
-    # Remove multiple spaces and newlines
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-    return cleaned_text.strip()
-
-def initialize_driver():
-    """Initialize Chrome driver with headless mode and other options."""
-    chrome_options = Options()
-    chrome_options.add_argument('--ignore-certificate-errors')
-    chrome_options.add_argument('--headless') 
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    return webdriver.Chrome(options=chrome_options)
-
-def scrape_news_articles(driver, ticker, results_dict):
-    """Scrape news articles for a given ticker and update results dictionary."""
+
+from browser_pool import get_pool, USER_AGENT
+from dom_extract import extract_page
+from page_store import get_page_store
+from jsonl_sink import JsonlSink, compact_legacy
+from text_cleaning import clean_article_content
+
+MAX_ARTICLES_PER_TICKER = 5
+MIN_ARTICLE_LENGTH = 500
+# Browser workers for the JS-rendered news list pages; bounded by the driver pool
+WORKERS = int(os.getenv("YAHOO_WORKERS", "4"))
+# Concurrent plain-HTTP article fetches allowed per domain
+PER_DOMAIN_LIMIT = 4
+
+def get_article_urls(driver, ticker):
+    """Loads a ticker's Yahoo news page and returns the linked article URLs, or None if it failed to load."""
     url = f"https://finance.yahoo.com/quote/{ticker}/news/"
-    successful_scrapes = 0
     
     try:
         driver.get(url)
@@ -49,70 +35,192 @@ def scrape_news_articles(driver, ticker, results_dict):
         )
     except Exception as e:
         print(f"Error loading page for {ticker}: {e}")
-        return
+        return None
     
     news_links = driver.find_elements(By.CSS_SELECTOR, "ul.stream-items li a")
-    article_urls = {link.get_attribute('href') for link in news_links 
-                   if link.get_attribute('href') and "https://finance.yahoo.com/news" in link.get_attribute('href')}
+    hrefs = [link.get_attribute('href') for link in news_links]
+    # Keep page order (and drop duplicates) so the top stories are tried first
+    return list(dict.fromkeys(href for href in hrefs if href and "https://finance.yahoo.com/news" in href))
+
+def parse_article_html(url, html):
+    """Extracts an article from server-rendered HTML; returns None if it has too little content."""
+    soup = BeautifulSoup(html, "lxml")
+    article = soup.find("article")
+    if article is None:
+        return None
     
-    results_dict[ticker] = []
+    cleaned_content = clean_article_content(article.get_text(" "))
+    if len(cleaned_content) <= MIN_ARTICLE_LENGTH:
+        return None
     
-    for url in article_urls:
-        if successful_scrapes >= 5:
-            break
-            
+    title = soup.find("h1")
+    date = soup.find("time")
+    return {
+        "url": url,
+        "title": title.get_text(strip=True) if title else "No title found",
+        "date": date.get("datetime", "No date found") if date else "No date found",
+        "content": cleaned_content
+    }
+
+def stored_article(url):
+    """A fresh article from the shared page store, or None."""
+    page = get_page_store().get_fresh(url, view="article")
+    if page is None:
+        return None
+    return {"url": url, "title": page.meta.get("title"), "date": page.meta.get("date"), "content": page.text}
+
+def store_article(article, source, response=None):
+    kwargs = {}
+    if response is not None:
+        kwargs = dict(body=response.content, status=response.status_code,
+                      content_type=response.headers.get("content-type"), etag=response.headers.get("etag"),
+                      last_modified=response.headers.get("last-modified"))
+    get_page_store().put(article["url"], article["content"], view="article", source=source,
+                         meta={"title": article["title"], "date": article["date"]}, **kwargs)
+
+async def fetch_static_articles(urls):
+    """
+    Fetches article pages over plain HTTP, at most PER_DOMAIN_LIMIT at a time
+    per domain; articles already in the page store are not fetched again.
+    """
+    domain_limits = {}
+    articles = {}
+    pending = []
+    for url in dict.fromkeys(urls):
+        article = stored_article(url)
+        if article:
+            articles[url] = article
+        else:
+            pending.append(url)
+    
+    async with httpx.AsyncClient(headers={"User-Agent": USER_AGENT}, follow_redirects=True,
+                                 timeout=15, limits=httpx.Limits(max_connections=32)) as client:
+        async def fetch(url):
+            limit = domain_limits.setdefault(urlparse(url).netloc, asyncio.Semaphore(PER_DOMAIN_LIMIT))
+            async with limit:
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    print(f"Error fetching {url}: {e}")
+                    return
+            articles[url] = parse_article_html(url, response.text)
+            if articles[url]:
+                store_article(articles[url], "static", response)
+        
+        await asyncio.gather(*(fetch(url) for url in pending))
+    return articles
+
+def scrape_article_with_browser(driver, url):
+    """Renders an article in Chrome (expanding "Story Continues"); returns None if it has too little content."""
+    try:
+        driver.get(url)
+        
         try:
-            driver.get(url)
-            
-            try:
-                continue_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Story Continues']]"))
-                )
-                continue_button.click()
-            except:
-                pass
-            
-            try:
-                article_element = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "article"))
-                )
-                article_content = article_element.text
-                cleaned_content = clean_article_content(article_content)
-                
-                if len(cleaned_content) > 500:
-                    # Get article title
-                    try:
-                        title = driver.find_element(By.CSS_SELECTOR, "h1").text
-                    except:
-                        title = "No title found"
-                    
-                    # Get publication date
-                    try:
-                        date = driver.find_element(By.CSS_SELECTOR, "time").get_attribute("datetime")
-                    except:
-                        date = "No date found"
-                    
-                    article_data = {
-                        "url": url,
-                        "title": title,
-                        "date": date,
-                        "content": cleaned_content
-                    }
-                    
-                    results_dict[ticker].append(article_data)
-                    successful_scrapes += 1
-                    print(f"Successfully scraped article {successful_scrapes} for {ticker}")
+            continue_button = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, "//button[.//span[text()='Story Continues']]"))
+            )
+            continue_button.click()
+        except:
+            pass
+        
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "article"))
+            )
+            # Article text, title and date in one round-trip; only the first <article>, not related-story teasers
+            page = extract_page(driver, "article", first=True)
+            cleaned_content = clean_article_content(" ".join(page["texts"]))
             
-            except Exception as e:
-                print(f"Error extracting content from {url}: {e}")
-                continue
-                
+            if len(cleaned_content) > MIN_ARTICLE_LENGTH:
+                return {
+                    "url": url,
+                    "title": page["h1"] or "No title found",
+                    "date": page["time"] or "No date found",
+                    "content": cleaned_content
+                }
+        
         except Exception as e:
-            print(f"Error accessing {url}: {e}")
+            print(f"Error extracting content from {url}: {e}")
+            
+    except Exception as e:
+        print(f"Error accessing {url}: {e}")
+    return None
+
+def scrape_news_articles(driver, ticker, results_dict, article_urls=None):
+    """Scrape news articles for a given ticker in the browser and update results dictionary."""
+    if article_urls is None:
+        article_urls = get_article_urls(driver, ticker)
+        if article_urls is None:
+            return
+    
+    articles = results_dict.setdefault(ticker, [])
+    scraped = {article["url"] for article in articles}
     
-    print(f"Completed scraping for {ticker}. Successfully scraped {successful_scrapes} articles.")
+    for url in article_urls:
+        if len(articles) >= MAX_ARTICLES_PER_TICKER:
+            break
+        if url in scraped:
+            continue
+        
+        article_data = stored_article(url)
+        if article_data is None:
+            article_data = scrape_article_with_browser(driver, url)
+            if article_data:
+                store_article(article_data, "browser")
+        if article_data:
+            articles.append(article_data)
+            print(f"Successfully scraped article {len(articles)} for {ticker}")
+    
+    print(f"Completed scraping for {ticker}. Successfully scraped {len(articles)} articles.")
+
+def scrape_tickers(tickers, workers=WORKERS, emit=None):
+    """
+    Scrapes all tickers with ``workers`` browser workers:
+    1. news list pages (JS-rendered) in parallel pooled browsers,
+    2. every linked article over async HTTP with per-domain limits,
+    3. a browser pass only for tickers still short of articles.
+
+    ``emit(ticker, articles)`` is called as soon as a ticker's articles are final.
+    """
+    emit = emit or (lambda ticker, articles: None)
+    def collect(ticker):
+        with get_pool().borrow() as driver:
+            return get_article_urls(driver, ticker)
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        urls_by_ticker = dict(zip(tickers, executor.map(collect, tickers)))
+    
+    all_urls = [url for urls in urls_by_ticker.values() if urls for url in urls]
+    static_articles = asyncio.run(fetch_static_articles(all_urls))
+    
+    results = {}
+    for ticker in tickers:
+        urls = urls_by_ticker[ticker]
+        if urls is None:
+            continue
+        results[ticker] = [static_articles[url] for url in urls if static_articles.get(url)][:MAX_ARTICLES_PER_TICKER]
+        print(f"Fetched {len(results[ticker])} articles for {ticker} without a browser")
+        if len(results[ticker]) >= MAX_ARTICLES_PER_TICKER:
+            emit(ticker, results[ticker])
+    
+    def fallback(ticker):
+        with get_pool().borrow() as driver:
+            scrape_news_articles(driver, ticker, results, urls_by_ticker[ticker])
+        emit(ticker, results[ticker])
+    
+    short = [ticker for ticker in results if len(results[ticker]) < MAX_ARTICLES_PER_TICKER]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fallback, short))
+    
+    # Same ticker order (and JSON schema) as the serial scraper
+    return {ticker: results[ticker] for ticker in tickers if ticker in results}
 
 def main():
+    parser = argparse.ArgumentParser(description="Scrape Yahoo Finance news for the tickers in companies.csv.")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="parallel browser workers")
+    args = parser.parse_args()
+
     companies = []  
     tickers = []   
     with open("companies.csv", mode="r", encoding="utf-8") as file:
@@ -126,21 +234,22 @@ def main():
                     tickers.append(ticker)
 
     # tickers = ["MLNK", "PD", "AMPL", "CMPO", "WEAV", "VNET", "EGHT"]
-    results = {}
-    
-    driver = initialize_driver()
-    
-    try:
-        for ticker in tickers:
-            print(f"\nStarting to scrape {ticker}")
-            scrape_news_articles(driver, ticker, results)
-            
-        # Write results to JSON file
-        with open('yahoo_results_1.json', 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-            
-    finally:
-        driver.quit()
+    # Articles are appended per ticker as they are scraped; a rerun after a crash skips finished tickers
+    sink = JsonlSink("yahoo_results_1.jsonl", ("ticker", "url"))
+
+    def emit(ticker, articles):
+        for article in articles:
+            if sink.count(ticker) >= MAX_ARTICLES_PER_TICKER:
+                break
+            sink.write({"ticker": ticker, **article})
+
+    pending = [ticker for ticker in tickers if sink.count(ticker) < MAX_ARTICLES_PER_TICKER]
+    scrape_tickers(pending, workers=args.workers, emit=emit)
+    sink.close()
+
+    # Write results to JSON file in companies.csv order, [] for tickers without articles, then mark the stream complete
+    compact_legacy("yahoo_results_1.jsonl", group_order=tickers)
+    sink.mark_complete()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()